@@ -0,0 +1,39 @@
+import sys
+import time
+from sclang.lib.parser import parse
+
+
+def letters(number, alphabet='abcdefghijklmnopqrstuvwxyz'):
+    name = ''
+    while True:
+        number, digit = divmod(number, len(alphabet))
+        name = alphabet[digit] + name
+        if number == 0:
+            return name
+
+
+def make_input(depth):
+    lines = ['/deep']
+    for level in range(depth):
+        indent = '  ' * level
+        name = 'level_' + letters(level)
+        event = 'EVENT_' + letters(level).upper()
+        lines.append(indent + name)
+        lines.append(indent + '  @' + event + ' -> ' + name)
+        lines.append(indent + '  @RESET -> ' + name)
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    for depth in [int(arg) for arg in sys.argv[1:]] or [250, 500, 1000]:
+        root_state = parse(make_input(depth))
+        start = time.perf_counter()
+        for state in root_state.all_states:
+            state.all_states
+            state.event_names
+        elapsed = time.perf_counter() - start
+        print('depth {:5} {:8.3f} s'.format(depth, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import subprocess
+import tempfile
+from tree_less import make_input
+from sclang.lib.parser import parse
+from sclang.lib.code import code, dispatches
+
+definitions = '''
+extern int x;
+extern int y;
+'''
+
+driver = r'''
+#include "bench.h"
+#include <stdio.h>
+#include <time.h>
+
+int x;
+int y;
+
+int main(void)
+{
+    static bench_event_t events[4096];
+    unsigned long seed = 1;
+    bench_sc_t sc;
+    struct timespec start, stop;
+    long i;
+    for (i = 0; i < 4096; i++)
+    {
+        seed = seed * 1103515245 + 12345;
+        events[i] = (bench_event_t)((seed >> 16) %% %(event_count)d);
+        x = (seed >> 8) & 1;
+    }
+    bench_init(&sc);
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (i = 0; i < %(events)d; i++)
+    {
+        x = i & 1;
+        bench_handle_event(&sc, events[i & 4095]);
+    }
+    clock_gettime(CLOCK_MONOTONIC, &stop);
+    printf("%%f\n", ((stop.tv_sec - start.tv_sec) * 1e9 +
+                     (stop.tv_nsec - start.tv_nsec)) / %(events)d);
+    return y == -1;
+}
+'''
+
+
+def object_size(cc, flags, source):
+    obj = source[:-2] + '.o'
+    subprocess.check_call([cc] + flags + ['-c', source, '-o', obj])
+    output = subprocess.check_output(['size', obj]).decode().splitlines()
+    text, data, bss = (int(value) for value in output[1].split()[:3])
+    return text, data
+
+
+def compare(root_state, events=2000000):
+    cc = os.environ.get('CC', 'cc')
+    print('{} states'.format(len(root_state.all_states)))
+    for dispatch in dispatches:
+        with tempfile.TemporaryDirectory() as output_dir:
+            code(root_state, output_dir, dispatch=dispatch)
+            with open(os.path.join(output_dir, 'bench_definitions.h'),
+                      'w') as file_:
+                file_.write(definitions)
+            driver_path = os.path.join(output_dir, 'driver.c')
+            with open(driver_path, 'w') as file_:
+                file_.write(driver % dict(
+                    events=events,
+                    event_count=len(root_state.event_names)))
+            source = os.path.join(output_dir, 'bench.c')
+            flags = ['-I', output_dir]
+            text, data = object_size(cc, ['-Os'] + flags, source)
+            executable = os.path.join(output_dir, 'bench')
+            subprocess.check_call([cc, '-O2'] + flags +
+                                  [driver_path, source, '-o', executable])
+            elapsed = float(subprocess.check_output([executable]))
+            print('{:<8} -Os text+rodata {:6} B data {:5} B, '
+                  '-O2 {:6.1f} ns/event'.format(dispatch, text, data, elapsed))
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    compare(parse(make_input(width, depth)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import asyncio
+from sclang.lib.parser import parse
+from sclang.lib.runtime import Program
+from sclang.lib.driver import Driver
+
+current_dir = os.path.dirname(__file__)
+input_path = os.path.join(current_dir, '..', 'tests', 'code', 'timed.sc')
+
+
+async def produce(instance, events, chunk):
+    # the events come in chunks, as read from a socket
+    for i in range(0, len(events), chunk):
+        for event in events[i:i + chunk]:
+            await instance.put(event)
+        await asyncio.sleep(0)
+
+
+async def watch(stalls):
+    # the longest time the loop was kept from running this task
+    loop = asyncio.get_event_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(0.001)
+        stalls.append(loop.time() - start - 0.001)
+
+
+async def bench(count, events_per_instance, chunk, budget):
+    with open(input_path) as input_file:
+        root_state = parse(input_file.read())
+    driver = Driver(budget=budget)
+    program = Program(root_state, timers=driver)
+    instances = [driver.spawn(program) for _ in range(count)]
+    events = ['START', 'STOP'] * (events_per_instance // 2)
+    stalls = []
+    tasks = [
+        asyncio.ensure_future(driver.run()),
+        asyncio.ensure_future(watch(stalls))
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[produce(instance, events, chunk) for instance in instances])
+    while any(instance.mailbox for instance in instances):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+    print('{} instances budget {:>10} {:8.3f} s {:10.0f} events/s '
+          '{:6.1f} ms max stall'.format(count, budget, elapsed,
+                                         count * len(events) / elapsed,
+                                         max(stalls, default=0) * 1000))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    events_per_instance = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    chunk = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    # an unbounded budget drains all the mailboxes before yielding
+    loop = asyncio.get_event_loop()
+    for budget in [1024, count * events_per_instance]:
+        loop.run_until_complete(
+            bench(count, events_per_instance, chunk, budget))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import sys
+import time
+import tempfile
+from tree_less import make_input
+from sclang.lib.parser import parse
+from sclang.lib.code import code, backends
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    root_state = parse(make_input(width, depth))
+    print('{} states'.format(len(root_state.all_states)))
+    with tempfile.TemporaryDirectory() as output_dir:
+        for backend in backends:
+            start = time.perf_counter()
+            code(root_state, output_dir, backend=backend)
+            elapsed = time.perf_counter() - start
+            print('{:<8} {:8.3f} s'.format(backend, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import sys
+from deep import letters
+
+
+def make_input(width, depth, events=1, guards=0, transients=0):
+    # every composite state has width substates down to the given depth,
+    # followed by its transient states
+    # the k-th event of a state leads to its (k+1)-th next sibling, the
+    # first guards ones being guarded with an internal else transition,
+    # and its first state chooses between its two first siblings through
+    # each transient state
+    assert events >= 1 and guards <= events and transients <= 26
+    names = ['s_' + letters(i) for i in range(width)]
+    lines = ['/synthetic']
+
+    def add_states(level, indent):
+        for i, name in enumerate(names):
+            lines.append(indent + name)
+            for k in range(events):
+                event = 'EVENT_' + letters(k).upper()
+                target = names[(i + k + 1) % width]
+                if k < guards:
+                    lines.append(indent + '  @' + event)
+                    lines.append(indent + '    ["guard_' + letters(k) +
+                                 '"] -> ' + target)
+                    lines.append(indent + '    [else] --')
+                    lines.append(indent + '      "count_' + letters(k) +
+                                 '++"')
+                else:
+                    lines.append(indent + '  @' + event + ' -> ' + target)
+            if i == 0:
+                for t in range(transients):
+                    lines.append(indent + '  @CHOOSE_' + letters(t).upper() +
+                                 ' -> choice_' + letters(t))
+            if level < depth:
+                add_states(level + 1, indent + '  ')
+        for t in range(transients):
+            lines.append(indent + '<>choice_' + letters(t))
+            lines.append(indent + '  ["choice_' + letters(t) + '"] -> ' +
+                         names[0])
+            lines.append(indent + '  [else] -> ' + names[1 % width])
+
+    add_states(1, '')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    # width depth [events [guards [transients]]]
+    args = [int(arg) for arg in sys.argv[1:]]
+    if len(args) < 2:
+        print('usage: generate.py width depth [events [guards [transients]]]')
+        sys.exit(1)
+    sys.stdout.write(make_input(*args))
+
+
+if __name__ == '__main__':
+    main()
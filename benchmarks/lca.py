@@ -0,0 +1,57 @@
+import sys
+import time
+import random
+import tempfile
+from deep import letters
+from sclang.lib.parser import parse
+from sclang.lib.code import code
+
+
+def make_input(width, depth, transitions, seed=0):
+    # width chains of depth nested states, with transitions between
+    # random states of different chains so that most of them
+    # exit and enter deep state hierarchies
+    rnd = random.Random(seed)
+    lines = ['/wide']
+    paths = [[
+        'wide/' + '/'.join('c{}_{}'.format(letters(chain), letters(level))
+                           for level in range(level_ + 1))
+        for level_ in range(depth)
+    ] for chain in range(width)]
+    for chain in range(width):
+        for level in range(depth):
+            indent = '  ' * level
+            lines.append(indent + 'c{}_{}'.format(letters(chain),
+                                                  letters(level)))
+            for i in range(transitions):
+                target = rnd.choice(rnd.choice(paths))
+                up = '../' * level
+                lines.append(indent + '  @EVENT_{} -> {}'.format(
+                    letters(i).upper(), up + target.split('/', 1)[1]))
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    transitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    depths = [int(arg) for arg in sys.argv[3:]] or [25, 50, 100]
+    for depth in depths:
+        root_state = parse(make_input(width, depth, transitions))
+        all_transitions = [
+            transition for state in root_state.all_states
+            for transition in state.transitions
+        ]
+        start = time.perf_counter()
+        for transition in all_transitions:
+            transition.state.common_ancestor(transition.target)
+        lca_time = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as output_dir:
+            start = time.perf_counter()
+            code(root_state, output_dir, backend='python')
+            code_time = time.perf_counter() - start
+        print('depth {:4} {:6} transitions lca {:7.3f} s code {:7.3f} s'.
+              format(depth, len(all_transitions), lca_time, code_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import importlib.util
+from sclang.lib.parser import parse
+from sclang.lib.runtime import Program, Machine
+from sclang.lib.code import code
+from sclang.lib.normalize import camel_case
+
+current_dir = os.path.dirname(__file__)
+
+
+def load(path):
+    spec = importlib.util.spec_from_file_location('bench_module', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def interpret(program, events):
+    # walks the state tree on every event
+    machine = Machine(program)
+    for event in events:
+        step = program.step(machine.configuration, program.event_ids[event])
+        machine._run(step, event)
+
+
+def measure(name, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print('{:<12} {:12.0f} events/s'.format(name, count / elapsed))
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        current_dir, '..', 'doc', 'life.sc')
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    with open(path) as input_file:
+        root_state = parse(input_file.read())
+    # every action is bound, so that both engines run them
+    actions = {
+        action: lambda state_chart, event: None
+        for state in root_state.all_states
+        for action in state.init_actions + state.exit_actions + [
+            action for transition in state.transitions
+            for action in transition.actions
+        ]
+    }
+    program = Program(root_state, actions=actions)
+    rnd = random.Random(0)
+    events = [rnd.choice(program.events) for _ in range(count)]
+    with tempfile.TemporaryDirectory() as output_dir:
+        output, = code(root_state, output_dir, language='python')
+        module = load(output)
+    event_ids = [module.EVENTS.index(event) for event in events]
+    state_chart = getattr(module, camel_case(root_state.name))(
+        actions=actions)
+    measure('interpreted', lambda: interpret(program, events), count)
+    measure('runtime', lambda: Machine(program).send_all(events), count)
+    measure('module', lambda: state_chart.handle_events(event_ids), count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+import os
+import timeit
+from sclang.lib.parser import Parser, parse
+
+current_dir = os.path.dirname(__file__)
+input_path = os.path.join(current_dir, '..', 'tests', 'code', 'composite.sc')
+
+
+def main():
+    with open(input_path) as input_file:
+        input_ = input_file.read()
+
+    # make sure the on-disk cache exists before measuring it
+    Parser(cache=True)
+    parse(input_)
+
+    cases = [
+        ('cold (grammar analysis)', lambda: Parser(cache=False).parse(input_)),
+        ('disk cache', lambda: Parser(cache=True).parse(input_)),
+        ('process cache', lambda: parse(input_)),
+    ]
+    for name, func in cases:
+        number = 20
+        elapsed = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print('{:<25} {:8.3f} ms'.format(name, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
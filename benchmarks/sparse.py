@@ -0,0 +1,34 @@
+import sys
+from dispatch import compare
+from sclang.lib.parser import parse
+
+
+def make_input(width, depth):
+    # every state handles its own event, so that most of the events
+    # are irrelevant to the active states
+    lines = ['/bench']
+
+    def add_states(prefix, level, indent):
+        names = [
+            '{}_{}'.format(prefix, chr(ord('a') + i % 26) * (i // 26 + 1))
+            for i in range(width)
+        ]
+        for i, name in enumerate(names):
+            lines.append(indent + name)
+            lines.append(indent + '  @' + name.upper() + ' -> ' +
+                         names[(i + 1) % width])
+            if level < depth:
+                add_states(name, level + 1, indent + '  ')
+
+    add_states('s', 1, '')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    compare(parse(make_input(width, depth)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import sys
+import json
+import time
+import platform
+import tempfile
+import deep
+from generate import make_input
+from sclang.lib.parser import parse, validate
+from sclang.lib.code import code
+from sclang.lib.graph import add_unique_name_attr
+from sclang.lib.environment import get_environment
+
+depth = 3
+events = 3
+guards = 1
+transients = 1
+
+
+def render_graph(root_state):
+    # the plantuml source, without running java
+    add_unique_name_attr(root_state)
+    get_environment().get_template('graph.jinja').render(root_state=root_state)
+
+
+def measure(func, repeat, setup=None):
+    # setup builds the argument of func outside of the timed call
+    best = float('inf')
+    for _ in range(repeat):
+        args = [] if setup is None else [setup()]
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(input_, output_dir, fields):
+    root_state = parse(input_)
+    states = len(root_state.all_states)
+    repeat = 3 if states < 10000 else 1
+    # validate resolves the transition targets in place
+    # so it is given a fresh statechart on every run
+    stages = [('parse', lambda: parse(input_, check=False), None),
+              ('validate', validate, lambda: parse(input_, check=False))]
+    stages.extend(('code ' + dispatch,
+                   lambda dispatch=dispatch: code(root_state, output_dir,
+                                                  dispatch=dispatch), None)
+                  for dispatch in ['switch', 'table', 'flat'])
+    stages.append(('graph', lambda: render_graph(root_state), None))
+    results = []
+    for stage, func, setup in stages:
+        result = dict(fields, states=states, stage=stage)
+        try:
+            elapsed = measure(func, repeat, setup)
+        except RecursionError:
+            # the deep statecharts may exceed the recursion limit
+            print('{:7} states {:<12} recursion limit exceeded'.format(
+                states, stage))
+            result['error'] = 'recursion limit exceeded'
+        else:
+            print('{:7} states {:<12} {:9.3f} s {:8.2f} us/state'.format(
+                states, stage, elapsed, elapsed / states * 1e6))
+            result['seconds'] = elapsed
+        results.append(result)
+    return results
+
+
+def run_wide(size, output_dir):
+    width = max(2, round(size**(1 / depth)))
+    input_ = make_input(width, depth, events, guards, transients)
+    return run(input_, output_dir, {
+        'axis': 'size',
+        'size': size,
+        'width': width
+    })
+
+
+def run_deep(levels, output_dir):
+    # a single state on each level
+    return run(deep.make_input(levels), output_dir, {
+        'axis': 'depth',
+        'depth': levels
+    })
+
+
+def main():
+    # output.json [size ...] [--depths depth ...]
+    output = sys.argv[1] if len(sys.argv) > 1 else 'suite.json'
+    args = sys.argv[2:]
+    depths = [10, 100, 1000, 2000]
+    if '--depths' in args:
+        depths = [int(arg) for arg in args[args.index('--depths') + 1:]]
+        args = args[:args.index('--depths')]
+    sizes = [int(arg) for arg in args] or [10, 100, 1000, 10000, 100000]
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for size in sizes:
+            results += run_wide(size, output_dir)
+        for levels in depths:
+            results += run_deep(levels, output_dir)
+    with open(output, 'w') as output_file:
+        json.dump(
+            {
+                'python': platform.python_version(),
+                'depth': depth,
+                'events': events,
+                'guards': guards,
+                'transients': transients,
+                'results': results
+            },
+            output_file,
+            indent=2)
+
+
+if __name__ == '__main__':
+    main()
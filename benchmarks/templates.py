@@ -0,0 +1,64 @@
+import os
+import tempfile
+import timeit
+from jinja2 import FileSystemLoader, ModuleLoader, FileSystemBytecodeCache
+from sclang.lib.parser import parse
+from sclang.lib.code import style, code_templates
+from sclang.lib.storage import StateStorage
+from sclang.lib.timers import Timers
+from sclang.lib.regions import Regions
+from sclang.lib.environment import (template_dir, create_environment,
+                                    compile_templates, get_environment)
+
+current_dir = os.path.dirname(__file__)
+input_path = os.path.join(current_dir, '..', 'tests', 'code', 'composite.sc')
+
+
+def template_variables(root_state):
+    # the variables code() renders the switch dispatch templates with
+    storage = StateStorage('enum', [
+        StateStorage.value_count(state) for state in root_state.all_states
+        if state.has_field
+    ])
+    return dict(style,
+                root_state=root_state,
+                storage=storage,
+                queue=None,
+                timers=Timers(root_state, style),
+                regions=Regions(root_state))
+
+
+def render(env, variables):
+    for name, _ in code_templates['switch']:
+        env.get_template(name).render(**variables)
+
+
+def main():
+    with open(input_path) as input_file:
+        variables = template_variables(parse(input_file.read()))
+
+    with tempfile.TemporaryDirectory() as compiled_dir, \
+            tempfile.TemporaryDirectory() as bytecode_dir:
+        compile_templates(compiled_dir)
+        cases = [
+            ('fresh environment', lambda: render(
+                create_environment(FileSystemLoader(template_dir)),
+                variables)),
+            ('fresh bytecode cache', lambda: render(
+                create_environment(FileSystemLoader(template_dir),
+                                   FileSystemBytecodeCache(bytecode_dir)),
+                variables)),
+            ('fresh precompiled', lambda: render(
+                create_environment(ModuleLoader(compiled_dir)), variables)),
+            ('shared environment', lambda: render(get_environment(),
+                                                  variables)),
+        ]
+        for name, func in cases:
+            number = 20
+            elapsed = min(timeit.repeat(func, number=number,
+                                        repeat=3)) / number
+            print('{:<22} {:8.3f} ms'.format(name, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
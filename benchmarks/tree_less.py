@@ -0,0 +1,52 @@
+import sys
+import time
+import tracemalloc
+from sclang.lib.parser import Parser
+
+
+def make_input(width, depth):
+    lines = ['/bench']
+
+    def add_states(prefix, level, indent):
+        names = [
+            '{}_{}'.format(prefix, chr(ord('a') + i % 26) * (i // 26 + 1))
+            for i in range(width)
+        ]
+        for i, name in enumerate(names):
+            lines.append(indent + name)
+            lines.append(indent + '  @NEXT -> ' + names[(i + 1) % width])
+            lines.append(indent + '  @OTHER')
+            lines.append(indent + '    ["x == 1"] -> ' + name)
+            lines.append(indent + '    [else] --')
+            lines.append(indent + '      "y++"')
+            if level < depth:
+                add_states(name, level + 1, indent + '  ')
+
+    add_states('s', 1, '')
+    return '\n'.join(lines) + '\n'
+
+
+def measure(parser, input_):
+    tracemalloc.start()
+    start = time.perf_counter()
+    root_state = parser.parse(input_)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return root_state, elapsed, peak
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    input_ = make_input(width, depth)
+    for tree_less in [False, True]:
+        parser = Parser(tree_less=tree_less)
+        root_state, elapsed, peak = measure(parser, input_)
+        print('{:<10} {} states {:8.3f} s {:8.1f} MiB peak'.format(
+            'tree-less' if tree_less else 'tree', len(root_state.all_states),
+            elapsed, peak / 2**20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import sys
+import time
+from deep import letters
+from sclang.lib.state_chart import State, EventHandler, Transition
+from sclang.lib.parser import validate
+
+
+def make_state_chart(branching):
+    # builds the state tree directly, skipping the parser, every atomic
+    # state having a relative transition to the next atomic state
+    leaves = []
+
+    def make_state(name, path, level):
+        if level == len(branching):
+            state = State(name)
+            leaves.append((state, path))
+            return state
+        return State(name,
+                     states=[
+                         make_state('s_' + letters(i), path + ['s_' + letters(i)],
+                                    level + 1) for i in range(branching[level])
+                     ])
+
+    root_state = make_state('bench', ['bench'], 0)
+    for i, (state, path) in enumerate(leaves):
+        target_path = leaves[(i + 1) % len(leaves)][1]
+        common = 0
+        while path[common] == target_path[common]:
+            common += 1
+        target = '../' * (len(path) - 1 - common) + '/'.join(
+            target_path[common:])
+        state.event_handlers = [
+            EventHandler('NEXT', transitions=[Transition(target)])
+        ]
+        state.event_handlers[0].state = state
+        state.transitions = state.event_handlers[0].transitions
+        state.transitions[0].state = state
+    return root_state
+
+
+def main():
+    for size in sys.argv[1:] or ['10x10x10', '10x10x100', '50x50x40']:
+        index_time = validate_time = float('inf')
+        for _ in range(3):
+            # validate resolves the transition targets in place
+            # so the chart is rebuilt for every run
+            root_state = make_state_chart([int(n) for n in size.split('x')])
+            start = time.perf_counter()
+            root_state.index()
+            index_time = min(index_time, time.perf_counter() - start)
+            start = time.perf_counter()
+            validate(root_state)
+            validate_time = min(validate_time, time.perf_counter() - start)
+        states = len(root_state.state_paths)
+        print('{:6} states index {:6.3f} s validate {:6.3f} s ({:.2f} us/state)'.
+              format(states, index_time, validate_time,
+                     validate_time / states * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,10 @@
 import os
 import sys
 import argparse
-from .lib.parser import parse, ParsingError
-from .lib.code import code
+from .lib.build import find_state_charts, build, write_depfile, write_manifest
+from .lib.code import backends, dispatches, languages
+from .lib.storage import storages
+from .lib.event_queue import queue_kinds
 
 current_dir = os.path.dirname(__file__)
 template_dir = os.path.join(current_dir, 'templates')
@@ -11,24 +13,104 @@ template_dir = os.path.join(current_dir, 'templates')
 def main():
     parser = argparse.ArgumentParser(
         description='Generates the statechart corresponding C code.')
-    parser.add_argument('state_chart',
-                        type=argparse.FileType('r'),
-                        help='statechart declaration file')
+    parser.add_argument(
+        'state_charts',
+        nargs='+',
+        metavar='state_chart',
+        help='statechart declaration files, directories or glob patterns')
     parser.add_argument('-o',
                         '--output',
                         default='.',
                         help='code output directory')
+    parser.add_argument('-j',
+                        '--jobs',
+                        type=int,
+                        help='number of parallel jobs (default: CPU count)')
+    parser.add_argument('--no-cache',
+                        action='store_true',
+                        help='regenerate every statechart')
+    parser.add_argument('--backend',
+                        choices=backends,
+                        default='jinja',
+                        help='code generator (default: jinja)')
+    parser.add_argument('--language',
+                        choices=languages,
+                        default='c',
+                        help='C code, or a standalone python module '
+                        'following the switch dispatch (default: c)')
+    parser.add_argument('--dispatch',
+                        choices=dispatches,
+                        default='switch',
+                        help='nested switch functions, const tables walked '
+                        'by a generic interpreter, or switch functions per '
+                        'active leaf state (default: switch)')
+    parser.add_argument('--storage',
+                        choices=storages,
+                        default='enum',
+                        help='state fields declared with their enum type, '
+                        'the smallest unsigned type or as bitfields '
+                        '(default: enum)')
+    parser.add_argument('--queue',
+                        type=int,
+                        metavar='CAPACITY',
+                        help='capacity of the generated event queue, '
+                        'overriding the statechart\'s #queue, '
+                        '0 for no queue')
+    parser.add_argument('--queue-kind',
+                        choices=queue_kinds,
+                        help='event queue posted to from the statechart '
+                        'thread, or lock-free single producer single '
+                        'consumer queue, overriding the statechart\'s '
+                        '#queue (default: plain)')
+    parser.add_argument('--depfile',
+                        help='write a Make/Ninja dependency file')
+    parser.add_argument('--manifest',
+                        help='write a JSON build manifest')
 
     args = parser.parse_args()
+    if args.backend == 'python' and args.dispatch != 'switch':
+        parser.error('the python backend only generates switch dispatch')
+    if args.language == 'python' and (args.backend != 'jinja'
+                                      or args.dispatch != 'switch'):
+        parser.error('the python modules follow the switch dispatch '
+                     'and are only generated from templates')
+    if args.dispatch == 'table' and args.storage == 'bitfield':
+        parser.error('the table dispatch needs addressable state fields')
+    if args.queue is not None and args.queue < 0:
+        parser.error('the queue capacity must not be negative')
 
-    try:
-        with args.state_chart:
-            root_state = parse(args.state_chart.read())
-    except ParsingError as exc:
-        print('Failed to read {}: {}'.format(args.state_chart.name, str(exc)))
-        sys.exit(1)
+    paths, missing = find_state_charts(args.state_charts)
+    failed = len(missing)
+    for pattern in missing:
+        print('Failed to read {}: no such file'.format(pattern))
+
+    options = dict(backend=args.backend,
+                   dispatch=args.dispatch,
+                   storage=args.storage,
+                   queue_capacity=args.queue,
+                   queue_kind=args.queue_kind,
+                   language=args.language)
+    results = build(paths, args.output, args.jobs, not args.no_cache,
+                    **options)
+    for path, result in zip(paths, results):
+        if result.error is not None:
+            print('Failed to read {}: {}'.format(path, result.error))
+            failed += 1
+
+    if args.depfile:
+        write_depfile(args.depfile, paths, results, **options)
+    if args.manifest:
+        write_manifest(args.manifest, paths, results, **options)
 
-    code(root_state, args.output)
+    if not args.no_cache:
+        hits = sum(result.cached for result in results)
+        generated = sum(result.error is None and not result.cached
+                        for result in results)
+        print('{} up to date (cache hits), {} generated (cache misses)'.format(
+            hits, generated))
+
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
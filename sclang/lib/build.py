@@ -0,0 +1,150 @@
+import os
+import glob
+import json
+from collections import namedtuple
+from multiprocessing import Pool
+from .parser import get_parser
+from .. import __version__
+from .code import get_environment, code, template_dependencies
+from .cache import BuildCache, cache_key
+from .error import Error
+
+BuildResult = namedtuple('BuildResult', ['error', 'outputs', 'cached'])
+
+
+def find_state_charts(patterns):
+    # a state chart matched by several patterns is only built once
+    paths = []
+    seen = set()
+    missing = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dir_path, dir_names, file_names in os.walk(pattern):
+                dir_names.sort()
+                paths.extend(
+                    os.path.join(dir_path, file_name)
+                    for file_name in sorted(file_names)
+                    if file_name.endswith('.sc'))
+        elif os.path.isfile(pattern):
+            paths.append(pattern)
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                missing.append(pattern)
+            paths.extend(matches)
+    unique_paths = []
+    for path in paths:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique_paths.append(path)
+    return unique_paths, missing
+
+
+def warm_up():
+    get_parser()
+    get_environment()
+
+
+def compile_state_chart(input_, output_dir, options):
+    try:
+        root_state = get_parser().parse(input_)
+        return None, code(root_state, output_dir, **options)
+    except (Error, OSError) as exc:
+        return str(exc), []
+    except Exception as exc:
+        # reported as the failure of this state chart alone
+        return '{}: {}'.format(type(exc).__name__, exc), []
+
+
+def _compile_state_chart(args):
+    return compile_state_chart(*args)
+
+
+def read_state_chart(path):
+    try:
+        with open(path) as state_chart:
+            return state_chart.read(), None
+    except OSError as exc:
+        return None, str(exc)
+
+
+def build(paths, output_dir, jobs=None, use_cache=True, **options):
+    cache = BuildCache(output_dir) if use_cache else None
+    results = [None] * len(paths)
+    pending = []
+    keys = {}
+    for i, path in enumerate(paths):
+        input_, error = read_state_chart(path)
+        if error is not None:
+            results[i] = BuildResult(error, [], False)
+            continue
+        if cache is not None:
+            keys[i] = cache_key(input_, **options)
+            outputs = cache.lookup(path, keys[i])
+            if outputs is not None:
+                results[i] = BuildResult(None, outputs, True)
+                continue
+        pending.append((i, input_))
+
+    for (i, _), (error, outputs) in zip(
+            pending,
+            _run([(input_, output_dir, options) for _, input_ in pending],
+                 jobs)):
+        outputs = [os.path.abspath(output) for output in outputs]
+        results[i] = BuildResult(error, outputs, False)
+        if cache is not None and error is None:
+            cache.update(paths[i], keys[i], outputs)
+
+    if cache is not None:
+        cache.save()
+    return results
+
+
+def _run(args, jobs):
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(args))
+    if jobs <= 1:
+        return [_compile_state_chart(arg) for arg in args]
+
+    # forked workers inherit the warm parser and environment,
+    # spawned ones build them once in the initializer
+    warm_up()
+    with Pool(jobs, initializer=warm_up) as pool:
+        return pool.map(_compile_state_chart, args, chunksize=1)
+
+
+def _escape_make(path):
+    return path.replace('$', '$$').replace('#', '\\#').replace(' ', '\\ ')
+
+
+def write_depfile(depfile, paths, results, **options):
+    templates = template_dependencies(**options)
+    with open(depfile, 'w') as depfile_:
+        for path, result in zip(paths, results):
+            if result.error is not None:
+                continue
+            dependencies = [os.path.abspath(path)] + templates
+            depfile_.write('{}: {}\n'.format(
+                ' '.join(_escape_make(output) for output in result.outputs),
+                ' '.join(_escape_make(dependency)
+                         for dependency in dependencies)))
+
+
+def write_manifest(manifest, paths, results, **options):
+    templates = template_dependencies(**options)
+    state_charts = []
+    for path, result in zip(paths, results):
+        entry = dict(input=os.path.abspath(path))
+        if result.error is None:
+            entry.update(outputs=result.outputs,
+                         templates=templates,
+                         cached=result.cached)
+        else:
+            entry.update(error=result.error)
+        state_charts.append(entry)
+    with open(manifest, 'w') as manifest_:
+        json.dump(dict(version=__version__, state_charts=state_charts),
+                  manifest_,
+                  indent=2)
@@ -0,0 +1,40 @@
+import os
+import json
+import hashlib
+from .. import __version__
+from .environment import templates_digest
+
+
+def cache_key(input_, **options):
+    digest = hashlib.sha256()
+    digest.update(__version__.encode('utf-8') + b'\0')
+    digest.update(templates_digest().encode('utf-8') + b'\0')
+    digest.update(json.dumps(options, sort_keys=True).encode('utf-8') + b'\0')
+    digest.update(input_.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class BuildCache:
+    file_name = '.sclang_cache.json'
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, self.file_name)
+        try:
+            with open(self.path) as cache_file:
+                self.entries = json.load(cache_file)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def lookup(self, path, key):
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is not None and entry['key'] == key and all(
+                os.path.exists(output) for output in entry['outputs']):
+            return entry['outputs']
+        return None
+
+    def update(self, path, key, outputs):
+        self.entries[os.path.abspath(path)] = dict(key=key, outputs=outputs)
+
+    def save(self):
+        with open(self.path, 'w') as cache_file:
+            json.dump(self.entries, cache_file, indent=2, sort_keys=True)
@@ -1,10 +1,19 @@
 import os
-from jinja2 import Environment, FileSystemLoader, StrictUndefined
+import filecmp
+from jinja2 import meta
+from . import environment
+from .environment import template_dir
+from .emitter import CEmitter, Writer
+from .tables import StateChartTables
+from .flat import FlatStateChart
+from .storage import StateStorage
+from .event_queue import EventQueue
+from .timers import Timers
+from .regions import Regions
+from .module import PythonModule
+from .error import Error
 from .normalize import upper_case, lower_case, camel_case
 
-current_dir = os.path.dirname(__file__)
-template_dir = os.path.join(current_dir, 'templates')
-
 
 def type_naming_style(*args):
     return lower_case(*args) + '_t'
@@ -25,16 +34,174 @@ style = {
 }
 
 
-def code(root_state, output_dir):
-    env = Environment(loader=FileSystemLoader(template_dir),
-                      trim_blocks=True,
-                      lstrip_blocks=True,
-                      undefined=StrictUndefined)
+def get_environment():
+    env = environment.get_environment()
     env.filters.update(style)
-    inputs = [('state_chart_header.jinja', 'h'),
-              ('state_chart_impl.jinja', 'c')]
+    return env
+
+
+def write_if_changed(path, content):
+    try:
+        with open(path) as file_:
+            if file_.read() == content:
+                return False
+    except OSError:
+        pass
+    with open(path, 'w') as file_:
+        file_.write(content)
+    return True
+
+
+code_templates = {
+    'switch': [('state_chart_header.jinja', 'h'),
+               ('state_chart_impl.jinja', 'c')],
+    'table': [('state_chart_header.jinja', 'h'),
+              ('state_chart_table_impl.jinja', 'c')],
+    'flat': [('state_chart_flat_header.jinja', 'h'),
+             ('state_chart_flat_impl.jinja', 'c')]
+}
+
+dispatches = list(code_templates)
+
+module_template = 'state_chart_module.jinja'
+
+languages = ['c', 'python']
+
+_template_dependencies = {}
+
+
+def root_templates(backend='jinja', dispatch='switch', language='c'):
+    if language == 'python':
+        return [module_template]
+    if backend == 'python':
+        return []
+    return [name for name, _ in code_templates[dispatch]]
+
+
+def template_dependencies(backend='jinja',
+                          dispatch='switch',
+                          language='c',
+                          **options):
+    # the templates loaded while generating the code with these options,
+    # found by following the extends, import and include tags of the ones
+    # rendered, the other options not changing them
+    key = (backend, dispatch, language)
+    if key not in _template_dependencies:
+        env = get_environment()
+        names = []
+        pending = root_templates(*key)
+        while pending:
+            name = pending.pop()
+            if name in names:
+                continue
+            names.append(name)
+            with open(os.path.join(template_dir, name)) as template:
+                ast = env.parse(template.read())
+            pending.extend(name for name in meta.find_referenced_templates(ast)
+                           if name is not None)
+        _template_dependencies[key] = [
+            os.path.join(template_dir, name) for name in sorted(names)
+        ]
+    return _template_dependencies[key]
+
+
+def stream_if_changed(path, emit):
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'w') as file_:
+            emit(Writer(file_))
+        if os.path.exists(path) and filecmp.cmp(path, temp_path,
+                                                shallow=False):
+            os.remove(temp_path)
+            return False
+        os.replace(temp_path, path)
+        return True
+    except BaseException:
+        # no partial output is left behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+backends = ['jinja', 'python']
+
+
+def code(root_state,
+         output_dir,
+         backend='jinja',
+         dispatch='switch',
+         storage='enum',
+         queue_capacity=None,
+         queue_kind=None,
+         language='c'):
     file_prefix = style['filename'](root_state.name)
-    for input_, ext in inputs:
+    outputs = []
+    if language == 'python':
+        if backend != 'jinja' or dispatch != 'switch':
+            raise Error('the python modules follow the switch dispatch '
+                        'and are only generated from templates')
+        # the steps of every configuration are compiled ahead, with the
+        # exit and entry ordering of the switch dispatch
+        template = get_environment().get_template(module_template)
+        output = os.path.join(output_dir, '.'.join([file_prefix, 'py']))
+        write_if_changed(
+            output,
+            template.render(style,
+                            root_state=root_state,
+                            module=PythonModule(root_state)))
+        return [output]
+    if dispatch == 'table' and storage == 'bitfield':
+        raise Error('the table dispatch needs addressable state fields')
+    if dispatch != 'switch' and any(state.is_parallel
+                                    for state in root_state.all_states):
+        raise Error('the {} dispatch doesn\'t support orthogonal regions'.
+                    format(dispatch))
+    timers = Timers(root_state, style)
+    if dispatch == 'flat':
+        flat = FlatStateChart(root_state, timers)
+        value_counts = [len(flat.states)]
+    else:
+        value_counts = [
+            StateStorage.value_count(state) for state in root_state.all_states
+            if state.has_field
+        ]
+    # the capacity and kind given on the command line override the
+    # statechart's, a capacity of 0 disabling the queue
+    if queue_capacity is None:
+        queue_capacity = root_state.queue_capacity
+    queue_kind = queue_kind or root_state.queue_kind or 'plain'
+    queue = EventQueue(queue_capacity, len(root_state.event_names), storage,
+                       queue_kind) if queue_capacity else None
+    state_storage = StateStorage(storage, value_counts, queue)
+    if backend == 'python':
+        if dispatch != 'switch':
+            raise Error('the python backend only generates switch dispatch')
+        # streams the code straight to the output files
+        # instead of rendering the templates
+        emitter = CEmitter(root_state, style, state_storage, queue, timers)
+        for emit, ext in [(emitter.header, 'h'), (emitter.impl, 'c')]:
+            output = os.path.join(output_dir, '.'.join([file_prefix, ext]))
+            stream_if_changed(output, emit)
+            outputs.append(output)
+        return outputs
+
+    env = get_environment()
+    variables = dict(style,
+                     root_state=root_state,
+                     storage=state_storage,
+                     queue=queue,
+                     timers=timers)
+    if dispatch == 'table':
+        variables['tables'] = StateChartTables(root_state, timers)
+    elif dispatch == 'flat':
+        variables['flat'] = flat
+    else:
+        variables['regions'] = Regions(root_state)
+    for input_, ext in code_templates[dispatch]:
         template = env.get_template(input_)
         output = os.path.join(output_dir, '.'.join([file_prefix, ext]))
-        template.stream(root_state=root_state, **style).dump(output)
+        # leave identical files untouched so that their mtime,
+        # and thus the dependent C objects, stay up to date
+        write_if_changed(output, template.render(**variables))
+        outputs.append(output)
+    return outputs
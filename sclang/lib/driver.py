@@ -0,0 +1,202 @@
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from .error import Error
+from .runtime import Machine
+
+
+class Instance(Machine):
+    # a machine handling the events posted to its mailbox
+    # once the driver gets to it
+    # an instance whose guards or actions raise is stopped, the exception
+    # being kept in error and raised to its senders and watchers
+    def __init__(self, driver, program):
+        self.driver = driver
+        self.mailbox = deque()
+        self.queued = False
+        self.error = None
+        self.timers = {}
+        self._senders = deque()
+        self._watchers = []
+        super().__init__(program)
+
+    def _check(self, event):
+        if self.error is not None:
+            raise self.error
+        if event not in self.program.event_ids:
+            raise Error('unknown event "{}"'.format(event))
+
+    def _post(self, event):
+        self.mailbox.append(event)
+        if not self.queued:
+            self.queued = True
+            self.driver._queue(self)
+
+    def put_nowait(self, event):
+        self._check(event)
+        if len(self.mailbox) >= self.driver.capacity:
+            raise asyncio.QueueFull
+        self._post(event)
+
+    async def put(self, event):
+        # the sender waits for the instance to drain its full mailbox
+        self._check(event)
+        while len(self.mailbox) >= self.driver.capacity:
+            future = asyncio.get_event_loop().create_future()
+            self._senders.append(future)
+            await future
+        self._post(event)
+
+    async def wait(self, path):
+        # until the instance is in the given state
+        if self.error is not None:
+            raise self.error
+        if self.is_in(path):
+            return
+        future = asyncio.get_event_loop().create_future()
+        self._watchers.append((path, future))
+        await future
+
+    def _drain(self, count):
+        mailbox = self.mailbox
+        count = min(count, len(mailbox))
+        for handled in range(count):
+            event = mailbox.popleft()
+            if type(event) is list:
+                # a timeout, dropped unless its timer is still the one
+                # started on entering the state
+                entry, event = event, event[3]
+                if self.timers.get(event) is not entry:
+                    continue
+                del self.timers[event]
+            try:
+                self.send(event)
+            except Exception as error:
+                self._fail(error)
+                return handled + 1
+        while self._senders and len(mailbox) < self.driver.capacity:
+            future = self._senders.popleft()
+            if not future.done():
+                future.set_result(None)
+        if self._watchers:
+            watchers = []
+            for path, future in self._watchers:
+                if future.done():
+                    continue
+                if self.is_in(path):
+                    future.set_result(None)
+                else:
+                    watchers.append((path, future))
+            self._watchers = watchers
+        return count
+
+    def _fail(self, error):
+        self.error = error
+        self.mailbox.clear()
+        for event in list(self.timers):
+            self.driver.cancel_timer(self, event)
+        futures = list(self._senders)
+        futures.extend(future for _, future in self._watchers)
+        self._senders.clear()
+        self._watchers = []
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+
+class Driver:
+    # runs statechart instances on the asyncio event loop, a single task
+    # draining the mailboxes of the instances having events in turn, at
+    # most batch events at a time for each, and yielding to the loop once
+    # budget events have been handled
+    # the driver is the timers of the programs of its instances, all the
+    # timers being kept in one heap whose earliest deadline is scheduled
+    # on the loop, the timeout events being posted regardless of capacity
+    # the cancelled timers are left in the heap, which is rebuilt
+    # once they make up most of it
+    # the expired timers are posted as such, their instance handling
+    # their timeout only if they were not cancelled meanwhile
+    def __init__(self, capacity=64, batch=16, budget=1024):
+        self.capacity = capacity
+        self.batch = batch
+        self.budget = budget
+        self._ready = deque()
+        self._wakeup = None
+        self._heap = []
+        self._cancelled = 0
+        self._sequence = itertools.count()
+        self._handle = None
+        self._loop = None
+
+    def spawn(self, program):
+        self._loop = asyncio.get_event_loop()
+        return Instance(self, program)
+
+    def _queue(self, instance):
+        self._ready.append(instance)
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+        ready = self._ready
+        while True:
+            if not ready:
+                self._wakeup = loop.create_future()
+                await self._wakeup
+                continue
+            handled = 0
+            while ready and handled < self.budget:
+                instance = ready.popleft()
+                instance.queued = False
+                handled += instance._drain(self.batch)
+                if instance.mailbox and not instance.queued:
+                    instance.queued = True
+                    ready.append(instance)
+            await asyncio.sleep(0)
+
+    def start_timer(self, instance, event, delay):
+        entry = [
+            self._loop.time() + delay / 1000,
+            next(self._sequence), instance, event
+        ]
+        instance.timers[event] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._schedule()
+
+    def cancel_timer(self, instance, event):
+        entry = instance.timers.pop(event, None)
+        if entry is None:
+            return
+        entry[2] = None
+        if entry[0] is None:
+            # expired, its timeout being already posted
+            return
+        self._cancelled += 1
+        if self._cancelled > 64 and 2 * self._cancelled > len(self._heap):
+            self._heap = [
+                entry for entry in self._heap if entry[2] is not None
+            ]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def _schedule(self):
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = self._loop.call_at(self._heap[0][0], self._expire)
+
+    def _expire(self):
+        self._handle = None
+        heap = self._heap
+        now = self._loop.time()
+        while heap and (heap[0][0] <= now or heap[0][2] is None):
+            entry = heapq.heappop(heap)
+            if entry[2] is None:
+                self._cancelled -= 1
+            else:
+                entry[0] = None
+                entry[2]._post(entry)
+        if heap:
+            self._schedule()
@@ -0,0 +1,909 @@
+from functools import wraps
+from contextlib import contextmanager
+from .regions import Regions
+
+notice = [
+    ' * @note This file was automatically generated using sclang '
+    '(https://github.com/alexis-boisserand/sclang).',
+    ' * Please don\'t edit it manually.'
+]
+
+
+def memoize(method):
+    # the naming style functions are costly and called
+    # several times for every state of the chart
+    @wraps(method)
+    def wrapper(self, key):
+        cache = self._memo.setdefault(method.__name__, {})
+        try:
+            return cache[key]
+        except KeyError:
+            value = cache[key] = method(self, key)
+            return value
+
+    return wrapper
+
+
+class Writer:
+    def __init__(self, output):
+        self._output = output
+        self._indentation = ''
+
+    def line(self, text=''):
+        if self._indentation and text:
+            # same line splitting as the jinja indent filter, which
+            # matters for actions holding exotic line separators
+            lines = (text + '\n\n').splitlines()
+            self._output.write(self._indentation + lines[0] + '\n' +
+                               '\n'.join(self._indentation +
+                                         line if line else line
+                                         for line in lines[1:]))
+        else:
+            self._output.write(text + '\n')
+
+    @contextmanager
+    def indent(self, width=4):
+        indentation = self._indentation
+        self._indentation += ' ' * width
+        try:
+            yield
+        finally:
+            self._indentation = indentation
+
+
+class CEmitter:
+    def __init__(self, root_state, style, storage, queue=None, timers=None):
+        self.root_state = root_state
+        self.style = style
+        self.storage = storage
+        self.queue = queue
+        self.timers = timers
+        self.regions = Regions(root_state)
+        self._memo = {}
+        ns = root_state.name
+        self.ns = ns
+        self.event_type = style['type'](ns, 'event')
+        self.state_chart_type = style['type'](ns, 'sc')
+        self.pointer = style['pointer']('sc')
+        self.event_variable = style['variable']('evt')
+        self.event_count = len(root_state.event_names)
+        self.recurse_variable = style['variable']('recurse')
+        self.kept_variable = style['variable']('kept')
+        self.state_chart_param = (self.state_chart_type + '*', self.pointer)
+        self.event_handler_params = [
+            self.state_chart_param, (self.event_type, self.event_variable)
+        ]
+        self.timer_type = style['type'](ns, 'timer')
+        self.timer_wheel_type = style['type'](ns, 'timer', 'wheel')
+        self.timer_wheel_param = (self.timer_wheel_type + '*',
+                                  style['pointer']('timer', 'wheel'))
+        self.timer_count = style['constant'](ns, 'timer', 'count')
+        self.timer_slot_bits = style['constant'](ns, 'timer', 'slot', 'bits')
+        self.timer_slots = style['constant'](ns, 'timer', 'slots')
+        self.timer_levels = style['constant'](ns, 'timer', 'levels')
+        self.timer_wheel_init_sig = self.function_signature(
+            'void', style['function'](ns, 'timer', 'wheel', 'init'),
+            [self.timer_wheel_param])
+        self.timer_wheel_tick_sig = self.function_signature(
+            'void', style['function'](ns, 'timer', 'wheel', 'tick'),
+            [self.timer_wheel_param])
+        self.state_chart_init_sig = self.function_signature(
+            'void', style['function'](ns, 'init'), [self.state_chart_param] +
+            ([self.timer_wheel_param] if self.has_timers else []))
+        self.state_chart_event_handler_sig = self.function_signature(
+            'void', style['function'](ns, 'handle_event'),
+            self.event_handler_params)
+        events_param = ('const ' + self.event_type + '*',
+                        style['variable']('events'))
+        count_param = ('size_t', style['variable']('count'))
+        self.state_chart_events_handler_sig = self.function_signature(
+            'void', style['function'](ns, 'handle_events'),
+            [self.state_chart_param, events_param, count_param])
+        self.state_chart_step_all_sig = self.function_signature(
+            'void', style['function'](ns, 'step_all'),
+            [(self.state_chart_type + '*', style['pointer']('scs')),
+             events_param, count_param])
+        self.queue_capacity = style['constant'](ns, 'queue', 'capacity')
+        self.state_chart_post_sig = self.function_signature(
+            'bool', style['function'](ns, 'post'), self.event_handler_params)
+        self.state_chart_process_sig = self.function_signature(
+            'void', style['function'](ns, 'process'),
+            [self.state_chart_param])
+
+    @property
+    def has_timers(self):
+        return self.timers is not None and self.timers.count > 0
+
+    def init_actions(self, state):
+        if self.timers is None:
+            return state.init_actions
+        return self.timers.init_actions(state)
+
+    def exit_actions(self, state):
+        if self.timers is None:
+            return state.exit_actions
+        return self.timers.exit_actions(state)
+
+    def function_signature(self, return_type, name, parameters):
+        return '{} {}({})'.format(
+            return_type, name, ', '.join(
+                type_ + (' ' + name_ if name_ else '')
+                for type_, name_ in parameters))
+
+    @memoize
+    def state_enum_name(self, state):
+        elements = state.path_elements
+        return self.style['constant'](elements[0], 'st', *elements[1:])
+
+    @memoize
+    def event_enum_name(self, event):
+        return self.style['constant'](self.ns, 'evt', event)
+
+    @memoize
+    def state_enum_type_name(self, state):
+        return self.style['type'](*(state.path_elements + ['state']))
+
+    @memoize
+    def state_field_name(self, state):
+        return self.style['field'](*(state.path_elements[1:] + ['state']))
+
+    def state_function_name(self, state, suffix):
+        return self.style['function'](*(state.path_elements + [suffix]))
+
+    @memoize
+    def init_name(self, state):
+        suffix = '' if state.parent else '_'
+        return self.state_function_name(state, 'init') + suffix
+
+    @memoize
+    def exit_name(self, state):
+        return self.state_function_name(state, 'exit')
+
+    @memoize
+    def event_handler_name(self, state):
+        return self.state_function_name(state, 'handle_event')
+
+    def init_exit_params(self, state):
+        if state.is_atomic:
+            return [self.state_chart_param]
+        return [self.state_chart_param, ('bool', self.recurse_variable)]
+
+    def init_sig(self, state):
+        if self.regions.init_returns_kept(state):
+            return self.function_signature(
+                'static int', self.init_name(state),
+                self.init_exit_params(state) + [('int', self.kept_variable)])
+        return self.function_signature('static void', self.init_name(state),
+                                       self.init_exit_params(state))
+
+    def exit_sig(self, state):
+        return self.function_signature('static void', self.exit_name(state),
+                                       self.init_exit_params(state))
+
+    def event_handler_sig(self, state):
+        if not state.parent:
+            type_ = 'void'
+        elif self.regions.handler_returns_kept(state):
+            type_ = 'static int'
+        else:
+            type_ = 'static void'
+        return self.function_signature(type_, self.event_handler_name(state),
+                                       self.event_handler_params)
+
+    def call(self, name, state, recurse):
+        if state.is_atomic:
+            return '{}({});'.format(name, self.pointer)
+        return '{}({}, {});'.format(name, self.pointer, recurse)
+
+    def call_init(self, state, recurse, tracked=False):
+        if not self.regions.init_returns_kept(state):
+            return self.call(self.init_name(state), state, recurse)
+        args = [self.pointer] if state.is_atomic else [self.pointer, recurse]
+        if tracked:
+            return '{} = {}({});'.format(
+                self.kept_variable, self.init_name(state),
+                ', '.join(args + [self.kept_variable]))
+        return '{}({});'.format(self.init_name(state), ', '.join(args + ['0']))
+
+    def call_exit(self, state, recurse):
+        return self.call(self.exit_name(state), state, recurse)
+
+    def header_comment(self, writer, description):
+        writer.line('/**')
+        writer.line(' * @file')
+        writer.line(description)
+        for line in notice:
+            writer.line(line)
+        writer.line(' */')
+
+    def header(self, writer):
+        root_state = self.root_state
+        guard = self.style['constant'](root_state.name, 'H')
+        self.header_comment(
+            writer,
+            ' * Declarations for the {} statechart.'.format(root_state.name))
+        writer.line('#ifndef ' + guard)
+        writer.line('#define ' + guard)
+        writer.line('#include "{}.h"'.format(self.style['filename'](
+            root_state.name, 'definitions')))
+        if self.queue:
+            writer.line('#include <stdbool.h>')
+        writer.line('#include <stddef.h>')
+        if self.storage.storage != 'enum' or self.queue or self.has_timers:
+            writer.line('#include <stdint.h>')
+        if self.queue and self.queue.is_atomic:
+            writer.line('#include <stdatomic.h>')
+        writer.line()
+        writer.line('typedef enum')
+        writer.line('{')
+        event_names = list(root_state.event_names)
+        for i, event in enumerate(event_names):
+            separator = ',' if i < len(event_names) - 1 else ''
+            writer.line('    ' + self.event_enum_name(event) + separator)
+        writer.line('}} {};'.format(self.event_type))
+        writer.line()
+        if self.queue:
+            writer.line('#define {} {}'.format(self.queue_capacity,
+                                               self.queue.capacity))
+            writer.line()
+        for state in root_state.all_states:
+            if not state.has_field:
+                continue
+            writer.line('typedef enum')
+            writer.line('{')
+            for i, substate in enumerate(state.states):
+                if substate.is_transient:
+                    continue
+                separator = ',' if i < len(state.states) - 1 else ''
+                writer.line('    ' + self.state_enum_name(substate) +
+                            separator)
+            writer.line('}} {};'.format(self.state_enum_type_name(state)))
+            writer.line()
+        if self.has_timers:
+            self.timers_decl(writer)
+        writer.line('typedef struct')
+        writer.line('{')
+        for state in root_state.all_states:
+            if state.has_field:
+                writer.line('    {};'.format(
+                    self.storage.field(self.state_enum_type_name(state),
+                                       self.state_field_name(state),
+                                       self.storage.value_count(state))))
+        if self.queue:
+            field = self.style['field']
+            writer.line('    {};'.format(
+                self.queue.event_field(self.event_type, field('queue'),
+                                       self.queue_capacity)))
+            for name in self.queue.index_names:
+                writer.line('    {};'.format(
+                    self.queue.index_field(field('queue', name))))
+        if self.has_timers:
+            field = self.style['field']
+            writer.line('    {} {}[{}];'.format(
+                self.timer_type, field('timers'), self.timer_count))
+            writer.line('    {}* {};'.format(self.timer_wheel_type,
+                                            field('timer', 'wheel')))
+        writer.line('}} {};'.format(self.state_chart_type))
+        writer.line()
+        if self.storage.size:
+            writer.line('// fails to compile if the state fields '
+                        'take more room than expected')
+            timers_size = ''
+            if self.has_timers:
+                timers_size = (' + sizeof(void*) - 1 + {} * sizeof({}) + '
+                               'sizeof({}*)'.format(self.timer_count,
+                                                    self.timer_type,
+                                                    self.timer_wheel_type))
+            writer.line(
+                'typedef char {}[sizeof({}) <= {}{} ? 1 : -1];'.format(
+                    self.style['type'](self.ns, 'sc', 'size', 'check'),
+                    self.state_chart_type, self.storage.size, timers_size))
+            writer.line()
+        writer.line(self.state_chart_init_sig + ';')
+        writer.line(self.state_chart_event_handler_sig + ';')
+        writer.line(self.state_chart_events_handler_sig + ';')
+        writer.line(self.state_chart_step_all_sig + ';')
+        if self.queue:
+            writer.line(self.state_chart_post_sig + ';')
+            writer.line(self.state_chart_process_sig + ';')
+        if self.has_timers:
+            writer.line(self.timer_wheel_init_sig + ';')
+            writer.line(self.timer_wheel_tick_sig + ';')
+        writer.line()
+        writer.line('#endif // ' + guard)
+
+    def actions(self, writer, actions):
+        writer.line(';\n'.join(actions) + ';')
+
+    def transition(self, writer, state, transition, tracked):
+        if transition.is_internal:
+            self.actions(writer, transition.actions)
+            return
+
+        for exit_state, recurse in transition.exit_steps:
+            if not exit_state.is_transient:
+                writer.line(
+                    self.call_exit(exit_state, 'true' if recurse else 'false'))
+        if transition.actions:
+            self.actions(writer, transition.actions)
+        if tracked:
+            depth = self.regions.kept_depth(transition)
+            writer.line('{0} = {0} < {1} ? {0} : {1};'.format(
+                self.kept_variable, depth))
+        for init_state, recurse in transition.entry_steps:
+            writer.line(
+                self.call_init(init_state, 'true' if recurse else 'false',
+                               tracked))
+
+    def return_unless_active(self, writer, state):
+        state = state.exclusive_state
+        writer.line('if ({}->{} != {})'.format(
+            self.pointer, self.state_field_name(state.parent),
+            self.state_enum_name(state)))
+        writer.line('{')
+        writer.line('    return;')
+        writer.line('}')
+
+    def guarded_event_handler(self, writer, state, event_handler, tracked):
+        transitions = event_handler.transitions
+        for i, transition in enumerate(transitions):
+            if i == 0:
+                writer.line('if ({})'.format(transition.guard))
+            elif i == len(transitions) - 1 and transition.is_else_guard:
+                writer.line('else')
+            else:
+                writer.line('else if ({})'.format(transition.guard))
+            writer.line('{')
+            with writer.indent():
+                self.transition(writer, state, transition, tracked)
+            writer.line('}')
+
+    def init_impl(self, writer, state):
+        tracked = self.regions.init_returns_kept(state)
+        writer.line(self.init_sig(state))
+        writer.line('{')
+        with writer.indent():
+            if state.is_transient:
+                self.guarded_event_handler(writer, state,
+                                           state.event_handlers[0], tracked)
+            elif state.parent and not state.is_region:
+                writer.line('{}->{} = {};'.format(
+                    self.pointer, self.state_field_name(state.parent),
+                    self.state_enum_name(state)))
+            if self.init_actions(state):
+                self.actions(writer, self.init_actions(state))
+            if state.is_parallel:
+                writer.line('if ({})'.format(self.recurse_variable))
+                writer.line('{')
+                for region in state.states:
+                    writer.line('    ' + self.call_init(
+                        region, self.recurse_variable, tracked))
+                writer.line('}')
+            elif not state.is_atomic:
+                writer.line('if ({})'.format(self.recurse_variable))
+                writer.line('{')
+                writer.line('    ' + self.call_init(
+                    state.initial, self.recurse_variable, tracked))
+                writer.line('}')
+            if tracked:
+                writer.line('return {};'.format(self.kept_variable))
+        writer.line('}')
+
+    def exit_impl(self, writer, state):
+        writer.line(self.exit_sig(state))
+        writer.line('{')
+        with writer.indent():
+            if state.is_parallel:
+                writer.line('if ({})'.format(self.recurse_variable))
+                writer.line('{')
+                for region in state.states:
+                    writer.line('    ' + self.call_exit(
+                        region, self.recurse_variable))
+                writer.line('}')
+            elif not state.is_atomic:
+                writer.line('if ({})'.format(self.recurse_variable))
+                writer.line('{')
+                writer.line('    switch ({}->{})'.format(
+                    self.pointer, self.state_field_name(state)))
+                writer.line('    {')
+                for substate in state.states:
+                    if substate.is_transient:
+                        continue
+                    writer.line('    case {}:'.format(
+                        self.state_enum_name(substate)))
+                    writer.line('        ' + self.call_exit(
+                        substate, self.recurse_variable))
+                    writer.line('        break;')
+                writer.line('    }')
+                writer.line('}')
+            if self.exit_actions(state):
+                self.actions(writer, self.exit_actions(state))
+        writer.line('}')
+
+    def event_handler_impl(self, writer, state):
+        tracked = self.regions.handler_returns_kept(state)
+        returned = 'return {};'.format(
+            self.kept_variable) if tracked else 'return;'
+        writer.line(self.event_handler_sig(state))
+        writer.line('{')
+        with writer.indent():
+            if tracked:
+                writer.line('int {} = {};'.format(self.kept_variable,
+                                                  self.regions.depth(state)))
+                writer.line()
+            elif state.is_parallel:
+                writer.line('int {};'.format(self.kept_variable))
+                writer.line()
+            event_names = state.event_names
+            if not state.is_atomic and event_names:
+                if len(event_names) < self.event_count:
+                    writer.line('// the other events aren\'t handled '
+                                'by this state nor its substates')
+                    writer.line('switch ({})'.format(self.event_variable))
+                    writer.line('{')
+                    for event in event_names:
+                        writer.line('case {}:'.format(
+                            self.event_enum_name(event)))
+                    writer.line('    break;')
+                    writer.line('default:')
+                    writer.line('    ' + returned)
+                    writer.line('}')
+                    writer.line()
+                if state.is_parallel:
+                    writer.line('// the regions handle the event in turn, '
+                                'until one of them is left')
+                    for i, region in enumerate(state.states):
+                        writer.line('{} = {}({}, {});'.format(
+                            self.kept_variable,
+                            self.event_handler_name(region), self.pointer,
+                            self.event_variable))
+                        if (i < len(state.states) - 1
+                                or state.event_handlers):
+                            writer.line('if ({} < {})'.format(
+                                self.kept_variable,
+                                self.regions.depth(region)))
+                            writer.line('{')
+                            writer.line('    ' + returned)
+                            writer.line('}')
+                else:
+                    writer.line('switch ({}->{})'.format(
+                        self.pointer, self.state_field_name(state)))
+                    writer.line('{')
+                    for substate in state.states:
+                        if substate.is_transient:
+                            continue
+                        writer.line('case {}:'.format(
+                            self.state_enum_name(substate)))
+                        writer.line('    {}{}({}, {});'.format(
+                            self.kept_variable + ' = ' if tracked else '',
+                            self.event_handler_name(substate), self.pointer,
+                            self.event_variable))
+                        writer.line('    break;')
+                    writer.line('}')
+                if (not state.is_parallel and state.parent
+                        and state.event_handlers):
+                    writer.line()
+                    if tracked:
+                        writer.line('if ({} < {})'.format(
+                            self.kept_variable, self.regions.depth(state)))
+                        writer.line('{')
+                        writer.line('    ' + returned)
+                        writer.line('}')
+                    else:
+                        self.return_unless_active(writer, state)
+                writer.line()
+            if state.event_handlers:
+                writer.line('switch ({})'.format(self.event_variable))
+                writer.line('{')
+                for event_handler in state.event_handlers:
+                    writer.line('case {}:'.format(
+                        self.event_enum_name(event_handler.event)))
+                    with writer.indent():
+                        if event_handler.is_unguarded:
+                            self.transition(writer, state,
+                                            event_handler.transitions[0],
+                                            tracked)
+                        else:
+                            self.guarded_event_handler(
+                                writer, state, event_handler, tracked)
+                        writer.line('break;')
+                writer.line('}')
+            if tracked:
+                writer.line(returned)
+        writer.line('}')
+
+    def impl(self, writer):
+        root_state = self.root_state
+        self.header_comment(
+            writer,
+            ' * {} statechart implementation.'.format(root_state.name))
+        writer.line('#include "{}.h"'.format(self.style['filename'](
+            root_state.name)))
+        writer.line('#include <stdbool.h>')
+        writer.line()
+        if self.has_timers:
+            self.timers_impl(writer)
+        for state in root_state.all_states:
+            writer.line(self.init_sig(state) + ';')
+            if not state.is_transient:
+                writer.line(self.exit_sig(state) + ';')
+                writer.line(self.event_handler_sig(state) + ';')
+        writer.line()
+        for state in root_state.all_states:
+            self.init_impl(writer, state)
+            if not state.is_transient:
+                writer.line()
+                self.exit_impl(writer, state)
+                writer.line()
+                self.event_handler_impl(writer, state)
+            writer.line()
+        writer.line(self.state_chart_init_sig)
+        writer.line('{')
+        if self.queue:
+            for name in self.queue.index_names:
+                index = '{}->{}'.format(self.pointer,
+                                        self.style['field']('queue', name))
+                if self.queue.is_atomic:
+                    writer.line('    atomic_store_explicit(&{}, 0, '
+                                'memory_order_relaxed);'.format(index))
+                else:
+                    writer.line('    {} = 0;'.format(index))
+        if self.has_timers:
+            field = self.style['field']
+            writer.line('    {}->{} = {};'.format(self.pointer,
+                                                 field('timer', 'wheel'),
+                                                 self.timer_wheel_param[1]))
+            for index in range(self.timers.count):
+                timer = '{}->{}[{}]'.format(self.pointer, field('timers'),
+                                            index)
+                writer.line('    {}.{} = {};'.format(timer, field('index'),
+                                                    index))
+                writer.line('    {}.{} = NULL;'.format(timer, field('pprev')))
+        writer.line('    ' + self.call_init(root_state, 'true'))
+        writer.line('}')
+        writer.line()
+        self.batch_impl(writer)
+        if self.queue:
+            writer.line()
+            self.queue_impl(writer)
+        writer.line()
+
+    def batch_impl(self, writer):
+        handle_event = self.style['function'](self.ns, 'handle_event')
+        events = self.style['variable']('events')
+        count = self.style['variable']('count')
+        writer.line(self.state_chart_events_handler_sig)
+        writer.line('{')
+        with writer.indent():
+            writer.line('size_t i;')
+            writer.line('for (i = 0; i < {}; i++)'.format(count))
+            writer.line('{')
+            writer.line('    {}({}, {}[i]);'.format(handle_event, self.pointer,
+                                                 events))
+            writer.line('}')
+        writer.line('}')
+        writer.line()
+        writer.line(self.state_chart_step_all_sig)
+        writer.line('{')
+        with writer.indent():
+            writer.line('size_t i;')
+            writer.line('for (i = 0; i < {}; i++)'.format(count))
+            writer.line('{')
+            writer.line('    {}(&{}[i], {}[i]);'.format(
+                handle_event, self.style['pointer']('scs'), events))
+            writer.line('}')
+        writer.line('}')
+
+    def queue_impl(self, writer):
+        if self.queue.is_atomic:
+            self.spsc_queue_impl(writer)
+        else:
+            self.plain_queue_impl(writer)
+
+    def plain_queue_impl(self, writer):
+        field = self.style['field']
+        queue = '{}->{}'.format(self.pointer, field('queue'))
+        head = '{}->{}'.format(self.pointer, field('queue', 'head'))
+        count = '{}->{}'.format(self.pointer, field('queue', 'count'))
+        capacity = self.queue_capacity
+        cast = '({})'.format(
+            self.queue.event_type) if self.queue.event_type else ''
+        writer.line(self.state_chart_post_sig)
+        writer.line('{')
+        with writer.indent():
+            writer.line('unsigned tail;')
+            writer.line('if ({} == {})'.format(count, capacity))
+            writer.line('{')
+            writer.line('    return false;')
+            writer.line('}')
+            writer.line('// wraps around without a division')
+            writer.line('tail = {} + {};'.format(head, count))
+            writer.line('if (tail >= {})'.format(capacity))
+            writer.line('{')
+            writer.line('    tail -= {};'.format(capacity))
+            writer.line('}')
+            writer.line('{}[tail] = {}{};'.format(queue, cast,
+                                                  self.event_variable))
+            writer.line('{}++;'.format(count))
+            writer.line('return true;')
+        writer.line('}')
+        writer.line()
+        writer.line(self.state_chart_process_sig)
+        writer.line('{')
+        with writer.indent():
+            writer.line('// the events posted while handling one '
+                        'are handled in the same run')
+            writer.line('while ({} > 0)'.format(count))
+            writer.line('{')
+            with writer.indent():
+                writer.line('{0} {1} = ({0}){2}[{3}];'.format(
+                    self.event_type, self.event_variable, queue, head))
+                writer.line('if (++{} == {})'.format(head, capacity))
+                writer.line('{')
+                writer.line('    {} = 0;'.format(head))
+                writer.line('}')
+                writer.line('{}--;'.format(count))
+                writer.line('{}({}, {});'.format(
+                    self.style['function'](self.ns, 'handle_event'),
+                    self.pointer, self.event_variable))
+            writer.line('}')
+        writer.line('}')
+
+    def spsc_queue_impl(self, writer):
+        field = self.style['field']
+        queue = '{}->{}'.format(self.pointer, field('queue'))
+        head = '&{}->{}'.format(self.pointer, field('queue', 'head'))
+        tail = '&{}->{}'.format(self.pointer, field('queue', 'tail'))
+        capacity = self.queue_capacity
+        cast = '({})'.format(
+            self.queue.event_type) if self.queue.event_type else ''
+
+        def slot(index):
+            return '{0}[{1} >= {2} ? {1} - {2} : {1}]'.format(
+                queue, index, capacity)
+
+        def next_index(index):
+            return '{0} + 1 == 2 * {1} ? 0 : {0} + 1'.format(index, capacity)
+
+        writer.line(self.state_chart_post_sig)
+        writer.line('{')
+        with writer.indent():
+            writer.line('// only called by the producer, '
+                        'the only writer of the tail')
+            writer.line('unsigned tail = atomic_load_explicit({}, '
+                        'memory_order_relaxed);'.format(tail))
+            writer.line('// the slots released by the consumer '
+                        'are free to be written')
+            writer.line('unsigned head = atomic_load_explicit({}, '
+                        'memory_order_acquire);'.format(head))
+            writer.line('if (tail == (head >= {0} ? head - {0} : '
+                        'head + {0}))'.format(capacity))
+            writer.line('{')
+            writer.line('    return false;')
+            writer.line('}')
+            writer.line('{} = {}{};'.format(slot('tail'), cast,
+                                            self.event_variable))
+            writer.line('// publishes the event, and whatever '
+                        'the producer wrote before posting it')
+            writer.line('atomic_store_explicit({}, {}, '
+                        'memory_order_release);'.format(
+                            tail, next_index('tail')))
+            writer.line('return true;')
+        writer.line('}')
+        writer.line()
+        writer.line(self.state_chart_process_sig)
+        writer.line('{')
+        with writer.indent():
+            writer.line('// only called by the consumer, '
+                        'the only writer of the head')
+            writer.line('unsigned head = atomic_load_explicit({}, '
+                        'memory_order_relaxed);'.format(head))
+            writer.line('while (head != atomic_load_explicit({}, '
+                        'memory_order_acquire))'.format(tail))
+            writer.line('{')
+            with writer.indent():
+                writer.line('{0} {1} = ({0}){2};'.format(
+                    self.event_type, self.event_variable, slot('head')))
+                writer.line('head = {};'.format(next_index('head')))
+                writer.line('// releases the slot before handling the event')
+                writer.line('atomic_store_explicit({}, head, '
+                            'memory_order_release);'.format(head))
+                writer.line('{}({}, {});'.format(
+                    self.style['function'](self.ns, 'handle_event'),
+                    self.pointer, self.event_variable))
+            writer.line('}')
+        writer.line('}')
+
+    def timers_decl(self, writer):
+        field = self.style['field']
+        tick_ms = self.style['constant'](self.ns, 'timer', 'tick', 'ms')
+        timer = self.timer_type
+        writer.line('#ifndef ' + tick_ms)
+        writer.line('#define {} 1'.format(tick_ms))
+        writer.line('#endif')
+        writer.line('#define {0}(ms) (((ms) + {1} - 1) / {1})'.format(
+            self.timers.ticks, tick_ms))
+        writer.line('#define {} {}'.format(self.timer_count,
+                                           self.timers.count))
+        writer.line('#define {} 6'.format(self.timer_slot_bits))
+        writer.line('#define {} (1 << {})'.format(self.timer_slots,
+                                                  self.timer_slot_bits))
+        writer.line('#define {} 4'.format(self.timer_levels))
+        writer.line()
+        writer.line('typedef struct {0} {0};'.format(timer))
+        writer.line()
+        writer.line('// a timer, linked into the timer wheel slot '
+                    'it expires in')
+        writer.line('struct ' + timer)
+        writer.line('{')
+        writer.line('    {}* {};'.format(timer, field('next')))
+        writer.line('    {}** {};'.format(timer, field('pprev')))
+        writer.line('    uint32_t {};'.format(field('expiry')))
+        writer.line('    {} {};'.format(self.event_type, field('event')))
+        writer.line('    {} {};'.format(self.timers.index_type,
+                                        field('index')))
+        writer.line('};')
+        writer.line()
+        writer.line('// the timers of all the statecharts ticking together, '
+                    'in a hierarchical wheel')
+        writer.line('typedef struct')
+        writer.line('{')
+        writer.line('    uint32_t {};'.format(field('now')))
+        writer.line('    {}* {}[{}][{}];'.format(timer, field('slots'),
+                                                self.timer_levels,
+                                                self.timer_slots))
+        writer.line('}} {};'.format(self.timer_wheel_type))
+        writer.line()
+
+    def timers_impl(self, writer):
+        field = self.style['field']
+        function = self.style['function']
+        timer_type = self.timer_type
+        wheel_type = self.timer_wheel_type
+        bits = self.timer_slot_bits
+        levels = self.timer_levels
+        wheel = self.timer_wheel_param[1]
+        timer = self.style['variable']('timer')
+        now = '{}->{}'.format(wheel, field('now'))
+        next_ = field('next')
+        pprev = field('pprev')
+        slots = '{}->{}'.format(wheel, field('slots'))
+        mask = '({} - 1)'.format(self.timer_slots)
+        insert = function(self.ns, 'timer', 'insert')
+        unlink = function(self.ns, 'timer', 'unlink')
+        p = self.pointer
+        timers = '{}->{}'.format(p, field('timers'))
+        sc_wheel = '{}->{}'.format(p, field('timer', 'wheel'))
+        writer.line('static void {}({}* {}, {}* {})'.format(
+            insert, wheel_type, wheel, timer_type, timer))
+        writer.line('{')
+        with writer.indent():
+            writer.line('uint32_t expiry = {}->{};'.format(
+                timer, field('expiry')))
+            writer.line('uint32_t delta = expiry - {};'.format(now))
+            writer.line('unsigned level = 0;')
+            writer.line('{}** slot;'.format(timer_type))
+            writer.line('// beyond the wheel range, the timer is inserted '
+                        'again once its slot is cascaded')
+            writer.line('if (delta >> ({} * {}))'.format(levels, bits))
+            writer.line('{')
+            writer.line('    delta = ((uint32_t)1 << ({} * {})) - 1;'.format(
+                levels, bits))
+            writer.line('    expiry = {} + delta;'.format(now))
+            writer.line('}')
+            writer.line('while (delta >> ((level + 1) * {}))'.format(bits))
+            writer.line('{')
+            writer.line('    level++;')
+            writer.line('}')
+            writer.line(
+                'slot = &{}[level][(expiry >> (level * {})) & {}];'.format(
+                    slots, bits, mask))
+            writer.line('{}->{} = *slot;'.format(timer, next_))
+            writer.line('if ({}->{})'.format(timer, next_))
+            writer.line('{')
+            writer.line('    {0}->{1}->{2} = &{0}->{1};'.format(
+                timer, next_, pprev))
+            writer.line('}')
+            writer.line('{}->{} = slot;'.format(timer, pprev))
+            writer.line('*slot = {};'.format(timer))
+        writer.line('}')
+        writer.line()
+        writer.line('static void {}({}* {})'.format(unlink, timer_type,
+                                                    timer))
+        writer.line('{')
+        with writer.indent():
+            writer.line('*{0}->{1} = {0}->{2};'.format(timer, pprev, next_))
+            writer.line('if ({}->{})'.format(timer, next_))
+            writer.line('{')
+            writer.line('    {0}->{1}->{2} = {0}->{2};'.format(
+                timer, next_, pprev))
+            writer.line('}')
+            writer.line('{}->{} = NULL;'.format(timer, pprev))
+        writer.line('}')
+        writer.line()
+        writer.line(
+            'static void {}({}* {}, unsigned index, {} {}, uint32_t ticks)'.
+            format(self.timers.start, self.state_chart_type, p,
+                   self.event_type, self.event_variable))
+        writer.line('{')
+        with writer.indent():
+            writer.line('{}* {} = &{}[index];'.format(timer_type, timer,
+                                                      timers))
+            writer.line('{}->{} = {};'.format(timer, field('event'),
+                                              self.event_variable))
+            writer.line('// expires on the next tick at the earliest')
+            writer.line('{}->{} = {}->{} + (ticks ? ticks : 1);'.format(
+                timer, field('expiry'), sc_wheel, field('now')))
+            writer.line('{}({}, {});'.format(insert, sc_wheel, timer))
+        writer.line('}')
+        writer.line()
+        writer.line('static void {}({}* {}, unsigned index)'.format(
+            self.timers.cancel, self.state_chart_type, p))
+        writer.line('{')
+        with writer.indent():
+            writer.line('// the timer may have expired already')
+            writer.line('if ({}[index].{})'.format(timers, pprev))
+            writer.line('{')
+            writer.line('    {}(&{}[index]);'.format(unlink, timers))
+            writer.line('}')
+        writer.line('}')
+        writer.line()
+        writer.line(self.timer_wheel_init_sig)
+        writer.line('{')
+        with writer.indent():
+            writer.line('unsigned level;')
+            writer.line('unsigned slot;')
+            writer.line('{} = 0;'.format(now))
+            writer.line('for (level = 0; level < {}; level++)'.format(levels))
+            writer.line('{')
+            writer.line('    for (slot = 0; slot < {}; slot++)'.format(
+                self.timer_slots))
+            writer.line('    {')
+            writer.line('        {}[level][slot] = NULL;'.format(slots))
+            writer.line('    }')
+            writer.line('}')
+        writer.line('}')
+        writer.line()
+        writer.line(self.timer_wheel_tick_sig)
+        writer.line('{')
+        with writer.indent():
+            writer.line('{}** slot;'.format(timer_type))
+            writer.line('{}* {};'.format(timer_type, timer))
+            writer.line('unsigned level;')
+            writer.line('{}++;'.format(now))
+            writer.line('// the timers of the higher level slots starting '
+                        'now are spread over the lower levels')
+            writer.line(
+                'for (level = 1; level < {0} && !({1} & (((uint32_t)1 << '
+                '(level * {2})) - 1)); level++)'.format(levels, now, bits))
+            writer.line('{')
+            with writer.indent():
+                writer.line(
+                    'slot = &{}[level][({} >> (level * {})) & {}];'.format(
+                        slots, now, bits, mask))
+                writer.line('{} = *slot;'.format(timer))
+                writer.line('*slot = NULL;')
+                writer.line('while ({})'.format(timer))
+                writer.line('{')
+                writer.line('    {0}* {1} = {2}->{1};'.format(
+                    timer_type, next_, timer))
+                writer.line('    {}({}, {});'.format(insert, wheel, timer))
+                writer.line('    {} = {};'.format(timer, next_))
+                writer.line('}')
+            writer.line('}')
+            writer.line('// the expired timers are unlinked before their '
+                        'event is handled, which may start timers')
+            writer.line('slot = &{}[0][{} & {}];'.format(slots, now, mask))
+            writer.line('while (*slot)')
+            writer.line('{')
+            writer.line('    {} = *slot;'.format(timer))
+            writer.line('    {}({});'.format(unlink, timer))
+            writer.line(
+                '    {}(({}*)((char*)({} - {}->{}) - offsetof({}, {})), '
+                '{}->{});'.format(function(self.ns, 'handle_event'),
+                                   self.state_chart_type, timer, timer,
+                                   field('index'), self.state_chart_type,
+                                   field('timers'), timer, field('event')))
+            writer.line('}')
+        writer.line('}')
+        writer.line()
@@ -0,0 +1,62 @@
+import os
+import hashlib
+from jinja2 import (Environment, FileSystemLoader, ModuleLoader, ChoiceLoader,
+                    FileSystemBytecodeCache, StrictUndefined)
+
+current_dir = os.path.dirname(__file__)
+template_dir = os.path.join(current_dir, 'templates')
+compiled_template_dir = os.path.join(current_dir, 'compiled_templates')
+digest_file_name = 'templates.sha256'
+
+_templates_digest = None
+
+
+def templates_digest():
+    global _templates_digest
+    if _templates_digest is None:
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(template_dir)):
+            digest.update(name.encode('utf-8') + b'\0')
+            with open(os.path.join(template_dir, name), 'rb') as template:
+                digest.update(template.read() + b'\0')
+        _templates_digest = digest.hexdigest()
+    return _templates_digest
+
+
+def compiled_templates_are_valid(target):
+    try:
+        with open(os.path.join(target, digest_file_name)) as digest_file:
+            return digest_file.read().strip() == templates_digest()
+    except OSError:
+        return False
+
+
+def create_environment(loader, bytecode_cache=None):
+    return Environment(loader=loader,
+                       trim_blocks=True,
+                       lstrip_blocks=True,
+                       undefined=StrictUndefined,
+                       bytecode_cache=bytecode_cache)
+
+
+def compile_templates(target=compiled_template_dir):
+    env = create_environment(FileSystemLoader(template_dir))
+    env.compile_templates(target, zip=None)
+    with open(os.path.join(target, digest_file_name), 'w') as digest_file:
+        digest_file.write(templates_digest() + '\n')
+
+
+_env = None
+
+
+def get_environment():
+    global _env
+    if _env is None:
+        # the precompiled templates are only used
+        # if they match the current template sources
+        loaders = [FileSystemLoader(template_dir)]
+        if compiled_templates_are_valid(compiled_template_dir):
+            loaders.insert(0, ModuleLoader(compiled_template_dir))
+        _env = create_environment(ChoiceLoader(loaders),
+                                  FileSystemBytecodeCache())
+    return _env
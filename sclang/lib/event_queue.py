@@ -0,0 +1,46 @@
+from .tables import index_type
+from .storage import type_size
+
+queue_kinds = ['plain', 'spsc']
+
+
+class EventQueue:
+    # the fixed capacity ring buffer of the events posted to a statechart,
+    # stored at the end of the statechart structure
+    # the events are stored with their enum type, or with the smallest
+    # unsigned type able to hold them when the state fields are packed
+    # a plain queue is indexed by its head and count, a spsc one by its
+    # head and tail, owned by the consumer and the producer respectively
+    def __init__(self, capacity, event_count, storage, kind='plain'):
+        self.capacity = capacity
+        self.kind = kind
+        self.event_type = index_type(
+            event_count - 1) if storage != 'enum' else None
+        if kind == 'spsc':
+            # the indices wrap around at twice the capacity so that
+            # a full queue is told apart from an empty one
+            self.index_type = index_type(2 * capacity - 1)
+            self.index_names = ['head', 'tail']
+        else:
+            # the count goes up to the capacity
+            self.index_type = index_type(capacity)
+            self.index_names = ['head', 'count']
+
+    @property
+    def is_atomic(self):
+        return self.kind == 'spsc'
+
+    def event_field(self, enum_type, name, capacity):
+        return '{} {}[{}]'.format(self.event_type or enum_type, name,
+                                  capacity)
+
+    def index_field(self, name):
+        return '{}{} {}'.format('_Atomic ' if self.is_atomic else '',
+                                self.index_type, name)
+
+    @property
+    def field_sizes(self):
+        # the size and count of the packed fields, the atomic indices
+        # being assumed as large as their plain type
+        return [(type_size(self.event_type), self.capacity),
+                (type_size(self.index_type), 2)]
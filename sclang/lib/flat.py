@@ -0,0 +1,150 @@
+from collections import namedtuple, OrderedDict
+
+HandlerStep = namedtuple('HandlerStep',
+                         ['state', 'event_handler', 'check', 'leaf'])
+
+
+class FlatStateChart:
+    # the active configuration is encoded as the active leaf state,
+    # the states ancestors of a leaf being found at generation time
+    # states are enumerated in pre-order so that the leaves of a state
+    # are the enum values between the state and its last descendant
+    def __init__(self, root_state, timers=None):
+        self.root_state = root_state
+        self.timers = timers
+        self.states = [
+            state for state in root_state.all_states
+            if not state.is_root and not state.is_transient
+        ]
+        self.leaves = [state for state in self.states if state.is_atomic]
+        self.transients = [
+            state for state in root_state.all_states if state.is_transient
+        ]
+        self.last_states = OrderedDict()
+        for state in self.states:
+            # transient states have no enum value
+            substates = state.all_states
+            i = len(substates) - 1
+            while substates[i].is_transient:
+                i -= 1
+            self.last_states[state] = substates[i]
+        self._leaf_sets = {}
+        self._transient_leaves = {}
+        self._exit_groups = {}
+        self._event_ids = {
+            event: i
+            for i, event in enumerate(root_state.event_names)
+        }
+        # the states whose exit is generated as a function, for the
+        # transitions taken while the active leaf isn't known statically
+        self.exits = []
+        self.event_handlers = OrderedDict(
+            (leaf, self.leaf_event_handlers(leaf)) for leaf in self.leaves)
+        self.exits.sort(key=lambda state: state.id)
+
+    def init_actions(self, state):
+        if self.timers is None:
+            return state.init_actions
+        return self.timers.init_actions(state)
+
+    def exit_actions(self, state):
+        if self.timers is None:
+            return state.exit_actions
+        return self.timers.exit_actions(state)
+
+    def leaf_set(self, state):
+        if state not in self._leaf_sets:
+            self._leaf_sets[state] = frozenset(
+                substate for substate in state.all_states
+                if substate.is_atomic and not substate.is_transient)
+        return self._leaf_sets[state]
+
+    def descent(self, state):
+        # the states initialized when recursively entering the state
+        states = [state]
+        while not states[-1].is_atomic:
+            states.append(states[-1].initial)
+        return states
+
+    def transition_leaves(self, transition):
+        # the leaves that may be active once the transition is taken
+        state = self.descent(transition.entry_states[-1])[-1]
+        if not state.is_transient:
+            return frozenset([state])
+        if state not in self._transient_leaves:
+            # transient states may lead to one another, any leaf
+            # is assumed while the leaves of one are being computed
+            self._transient_leaves[state] = self.leaf_set(self.root_state)
+            self._transient_leaves[state] = frozenset().union(*[
+                self.transition_leaves(transition_)
+                for transition_ in state.transitions
+            ])
+        return self._transient_leaves[state]
+
+    def exit_states(self, leaf, state):
+        # the states exited from the leaf up to the given state included
+        return [leaf] + leaf.states_to_ancestor(state) + (
+            [state] if leaf is not state else [])
+
+    def exit_groups(self, state):
+        # the leaves of the state grouped by the exit actions run
+        # when leaving the state from them
+        # only the leaves of the state are walked, all_states listing
+        # them in the order of self.leaves
+        if state in self._exit_groups:
+            return self._exit_groups[state]
+        groups = OrderedDict()
+        for leaf in state.all_states:
+            if leaf.is_atomic and not leaf.is_transient:
+                actions = tuple(action
+                                for exit_state in self.exit_states(leaf, state)
+                                for action in self.exit_actions(exit_state))
+                if actions:
+                    groups.setdefault(actions, []).append(leaf)
+        self._exit_groups[state] = [(leaves, list(actions))
+                                    for actions, leaves in groups.items()]
+        return self._exit_groups[state]
+
+    def leaf_event_handlers(self, leaf):
+        event_handlers = OrderedDict()
+        for state in [leaf] + leaf.states_to_ancestor(None):
+            for event_handler in state.event_handlers:
+                event_handlers.setdefault(event_handler.event,
+                                          []).append(event_handler)
+        return [(event, self.handler_steps(leaf, event_handlers[event]))
+                for event in sorted(event_handlers, key=self._event_ids.get)]
+
+    def handler_steps(self, leaf, event_handlers):
+        # the event is handled by the leaf and its ancestors in turn,
+        # each as long as it is still active
+        steps = []
+        leaves = frozenset([leaf])
+        for event_handler in event_handlers:
+            state = event_handler.state
+            active = leaves & self.leaf_set(state)
+            if not active:
+                continue
+            external = False
+            handled = False
+            after = leaves - active
+            for transition in event_handler.transitions:
+                if transition.is_internal:
+                    after |= active
+                else:
+                    external = True
+                    after |= self.transition_leaves(transition)
+                if transition.guard is None or transition.is_else_guard:
+                    handled = True
+            if not handled:
+                after |= active
+            known = next(iter(active)) if len(active) == 1 else None
+            if external and known is None and self.exit_groups(state):
+                if state not in self.exits:
+                    self.exits.append(state)
+            steps.append(
+                HandlerStep(state=state,
+                            event_handler=event_handler,
+                            check=active != leaves,
+                            leaf=known))
+            leaves = after
+        return steps
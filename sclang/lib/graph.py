@@ -1,9 +1,8 @@
 import os
 from subprocess import Popen, PIPE
-from jinja2 import Environment, FileSystemLoader, StrictUndefined
+from .environment import get_environment
 
 current_dir = os.path.dirname(__file__)
-template_dir = os.path.join(current_dir, 'templates')
 plantuml_bin = os.path.join(current_dir, 'plantuml', 'plantuml.jar')
 
 
@@ -17,11 +16,7 @@ def add_unique_name_attr(root_state):
 
 def graph(root_state):
     add_unique_name_attr(root_state)
-    env = Environment(loader=FileSystemLoader(template_dir),
-                      trim_blocks=True,
-                      lstrip_blocks=True,
-                      undefined=StrictUndefined)
-    template = env.get_template('graph.jinja')
+    template = get_environment().get_template('graph.jinja')
     with Popen(['java', '-jar', plantuml_bin, '-p'], stdin=PIPE,
                stdout=PIPE) as proc:
         template.stream(root_state=root_state).dump(proc.stdin,
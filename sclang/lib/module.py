@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from .runtime import Program
+from .normalize import camel_case
+
+
+class _ModuleProgram(Program):
+    # steps keeping the guards and actions as they are declared
+    transient_cycles = False
+
+    def _actions(self, actions):
+        return tuple(actions)
+
+
+class PythonModule:
+    # the tables of a generated python module, every configuration reachable
+    # from the initial one being compiled along with its steps whatever
+    # the outcomes of the guards
+    # the actions are numbered after the declared ones, then a start and a
+    # cancel action for each timer
+    def __init__(self, root_state):
+        self.root_state = root_state
+        self.class_name = camel_case(root_state.name)
+        self.states = [
+            state for state in root_state.all_states
+            if not state.is_root and not state.is_transient
+        ]
+        self.state_ids = {state: i for i, state in enumerate(self.states)}
+        guards = OrderedDict()
+        actions = OrderedDict()
+        self.timers = []
+        for state in root_state.all_states:
+            for action in state.init_actions + state.exit_actions:
+                actions.setdefault(action, len(actions))
+            for event_handler in state.event_handlers:
+                if event_handler.timeout is not None:
+                    self.timers.append(event_handler)
+            for transition in state.transitions:
+                for action in transition.actions:
+                    actions.setdefault(action, len(actions))
+                if (transition.guard is not None
+                        and not transition.is_else_guard):
+                    guards.setdefault(transition.guard, len(guards))
+        self.guards = list(guards)
+        self.guard_ids = guards
+        self.actions = list(actions)
+        self.action_ids = actions
+        for i, event_handler in enumerate(self.timers):
+            start = len(self.actions) + 2 * i
+            self.action_ids['start', event_handler.event] = start
+            self.action_ids['cancel', event_handler.event] = start + 1
+        self.program = _ModuleProgram(root_state,
+                                      {guard: guard
+                                       for guard in guards},
+                                      timers=self)
+        self._explore()
+
+    def _explore(self):
+        program = self.program
+        steps = [program.initial]
+        configuration = 0
+        while steps or configuration < len(program.configurations):
+            if not steps:
+                steps = [
+                    program.rows[configuration][event]
+                    or program.step(configuration, event)
+                    for event in range(len(program.events))
+                ]
+                configuration += 1
+                continue
+            step = steps.pop()
+            if len(step) != 2:
+                steps.append(step[2] or program.branch(step, True))
+                steps.append(step[3] or program.branch(step, False))
+
+    @property
+    def events(self):
+        return self.program.events
+
+    @property
+    def initial(self):
+        return self.step(self.program.initial)
+
+    @property
+    def rows(self):
+        return [[self.step(step) for step in row] for row in self.program.rows]
+
+    def active_states(self, configuration):
+        return sorted(self.state_ids[state]
+                      for state in self.program.active_states(configuration)
+                      if state in self.state_ids)
+
+    def literal(self, value):
+        return repr(value)
+
+    def step(self, step):
+        # the step as a python literal
+        actions = tuple(self.action_ids[action] for action in step[0])
+        if len(step) == 2:
+            return repr((actions, step[1]))
+        return '({!r}, {}, {}, {})'.format(actions,
+                                           self.guard_ids[step[1]],
+                                           self.step(step[2]),
+                                           self.step(step[3]))
@@ -3,6 +3,7 @@ from lark.indenter import Indenter
 from lark.exceptions import LarkError
 from .state_chart import Transition, EventHandler, State
 from .error import Error
+from .normalize import lower_case
 
 
 class ParsingError(Error):
@@ -28,8 +29,15 @@ class ScIndenter(Indenter):
 
 class ScTransformer(Transformer):
     @v_args(inline=True)
-    def start(self, state_name, attributes):
-        return State(state_name, **attributes)
+    def start(self, state_name, *attributes):
+        root_state = State(state_name, **attributes[-1])
+        if len(attributes) > 1:
+            root_state.queue_capacity, root_state.queue_kind = attributes[0]
+        return root_state
+
+    @v_args(inline=True)
+    def queue(self, capacity, kind=None):
+        return int(capacity), str(kind) if kind is not None else None
 
     @v_args(inline=True)
     def attributes(self, *attributes):
@@ -57,16 +65,22 @@ class ScTransformer(Transformer):
 
     @v_args(inline=True)
     def unguarded_event_handler(self, event, target):
-        return EventHandler(event, transitions=[Transition(**target)])
+        return EventHandler(**event, transitions=[Transition(**target)])
 
     @v_args(inline=True)
     def guarded_event_handler(self, event, *transitions):
-        return EventHandler(event, transitions=transitions)
+        return EventHandler(**event, transitions=transitions)
 
     @v_args(inline=True)
     def regular_state(self, state_name, *attributes):
         return State(state_name, **(attributes[0]) if attributes else {})
 
+    @v_args(inline=True)
+    def region(self, state_name, *attributes):
+        return State(state_name,
+                     is_region=True,
+                     **(attributes[0]) if attributes else {})
+
     @v_args(inline=True)
     def transient_state(self, state_name, *transitions):
         return State(
@@ -75,7 +89,14 @@ class ScTransformer(Transformer):
 
     @v_args(inline=True)
     def event(self, event_name):
-        return event_name
+        return dict(event=event_name)
+
+    @v_args(inline=True)
+    def timeout(self, duration):
+        # the event is named after the state, once the tree is built
+        if duration.endswith('ms'):
+            return dict(event=None, timeout=int(duration[:-2]))
+        return dict(event=None, timeout=int(duration[:-1]) * 1000)
 
     @v_args(inline=True)
     def target(self, target_):
@@ -144,47 +165,56 @@ def collect_attributes(attributes):
 
 
 def unique(list_):
-    set_ = set()
-    for x in list_:
-        if x in set_:
-            return False
-        set_.add(x)
-    return True
-
+    return len(set(list_)) == len(list_)
 
-def join(path1, path2):
-    if path1 == '':
-        return path1 + path2
-    return path1 + '/' + path2
 
-
-def validate_states_are_reachable(states):
+def validate_states_are_reachable(table):
     # all states are reachable
     # if all atomic states are reachable
     # either by being the transition target of a reachable state
-    # or by being the initial state of a reachable state
+    # or by being the initial state or a region of a reachable state
+    # or a region entered along a reachable state
+    states = table.states
     assert len(states) > 0
 
-    def next_(srcs):
-        dests = []
-        for src in srcs:
-            for transition in src.transitions:
-                if transition.target is not None and transition.target not in reachables:
-                    dests.append(transition.target)
-            if not src.is_atomic and src.initial not in reachables:
-                dests.append(src.initial)
-        return dests
-
-    srcs = [next(iter(states))]
-    reachables = set(srcs)
-    while len(srcs) > 0:
-        srcs = next_(srcs)
-        reachables.update(srcs)
-
-    for substate in states:
-        if substate.is_atomic and substate not in reachables:
+    # the innermost region containing each state, or -1
+    region_ids = [-1] * len(states)
+    for id_, state in enumerate(states):
+        if state.is_region:
+            region_ids[id_] = id_
+        elif id_ > 0:
+            region_ids[id_] = region_ids[table.parents[id_]]
+    entered_regions = bytearray(len(states))
+
+    reachables = bytearray(len(states))
+    reachables[0] = 1
+    srcs = [0]
+    while srcs:
+        src = srcs.pop()
+        dests = [
+            transition.target.id for transition in states[src].transitions
+            if transition.target is not None
+        ]
+        if states[src].is_parallel:
+            dests.extend(region.id for region in states[src].states)
+        elif table.first_children[src] >= 0:
+            dests.append(table.first_children[src])
+        region_id = region_ids[src]
+        while region_id >= 0 and not entered_regions[region_id]:
+            entered_regions[region_id] = 1
+            region = states[region_id]
+            dests.extend(sibling.id for sibling in region.parent.states
+                         if sibling is not region)
+            region_id = region_ids[region.parent.id]
+        for dest in dests:
+            if not reachables[dest]:
+                reachables[dest] = 1
+                srcs.append(dest)
+
+    for id_, state in enumerate(states):
+        if state.is_atomic and not reachables[id_]:
             raise DefinitionError('state "{}" is unreachable'.format(
-                substate.name))
+                state.name))
 
 
 def validate_states_names(state):
@@ -193,6 +223,13 @@ def validate_states_names(state):
             state.name))
 
 
+def validate_regions(state):
+    regions = [substate.is_region for substate in state.states]
+    if any(regions) and not all(regions):
+        raise DefinitionError('state "{}" mixes regions and states'.format(
+            state.name))
+
+
 def validate_event_names(state):
     event_names = [
         event_handler.event for event_handler in state.event_handlers
@@ -209,68 +246,145 @@ def validate_guards(event_handler):
             event_handler.event))
 
 
-def validate_target_path(transition):
-    if transition.target is None:
-        return transition.state.path
-
-    def raise_invalid():
-        raise DefinitionError(
-            'target path "{}" in state "{}" is invalid'.format(
-                transition.target, transition.state.name))
+def resolve_target(table, transition):
+    # returns the id of the target state, or None if it doesn't exist
+    # relative paths start from the parent state, going above the root
+    # state leads to the id -1 whose only child is the root state
+    state = transition.state
+    elements = transition.target.split('/')
+    id_ = table.parents[state.id]
+    i = 0
+    if elements[0] == '..':
+        if state.is_root:
+            raise DefinitionError(
+                'target path "{}" in state "{}" is invalid'.format(
+                    transition.target, state.name))
+        while elements[i] == '..':
+            if id_ < 0:
+                raise DefinitionError(
+                    'target path "{}" in state "{}" is invalid'.format(
+                        transition.target, state.name))
+            id_ = table.parents[id_]
+            i += 1
+    children = table.children
+    for element in elements[i:]:
+        id_ = children.get((id_, element))
+        if id_ is None:
+            return None
+    return id_
+
+
+def name_timeouts(root_state):
+    # a timed event handler raises an event named after its state
+    # the states are walked with an explicit stack, the state tree
+    # being as deep as the input is long
+    pending = [(root_state, [])]
+    while pending:
+        state, path_elements = pending.pop()
+        for event_handler in state.event_handlers:
+            if event_handler.timeout is not None:
+                event_handler.event = lower_case(*(path_elements +
+                                                   ['timeout']))
+        pending.extend((substate, path_elements + [substate.name])
+                       for substate in state.states)
 
-    if transition.target.startswith('..'):
-        if transition.state.is_root:
-            raise_invalid()
-        elements = transition.state.parent.path.split('/')
-        target_elements = transition.target.split('/')
-        for i, element in enumerate(target_elements):
-            if element != '..':
-                break
-        if i > len(elements):
-            raise_invalid()
-        return '/'.join(elements[:-i] + target_elements[i:])
 
-    prefix_path = transition.state.parent.path if not transition.state.is_root else ''
-    return join(prefix_path, transition.target)
+def validate_timeouts(table):
+    events = {}
+    for state in table.states:
+        for event_handler in state.event_handlers:
+            if event_handler.event is not None:
+                events.setdefault(lower_case(event_handler.event),
+                                  []).append(event_handler)
+    for event_handlers in events.values():
+        timed = [
+            event_handler for event_handler in event_handlers
+            if event_handler.timeout is not None
+        ]
+        if timed and len(event_handlers) > 1:
+            raise DefinitionError(
+                'event "{}" clashes with the timed transition of state "{}"'.
+                format(event_handlers[0].event, timed[0].state.name))
 
 
 def validate(root_state):
-    state_paths = root_state.state_paths
+    if root_state.table is None:
+        root_state.index()
+    table = root_state.table
 
-    for state in state_paths.values():
+    if root_state.queue_capacity is not None and root_state.queue_capacity < 1:
+        raise DefinitionError('queue capacity of "{}" is not positive'.format(
+            root_state.name))
+
+    for state in table.states:
 
         for event_handler in state.event_handlers:
             validate_guards(event_handler)
 
             for transition in event_handler.transitions:
-                target_path = validate_target_path(transition)
-                target_state = state_paths.get(target_path)
-                if target_state is None:
+                # internal transition mean target is None
+                if transition.target is None:
+                    continue
+                target_id = resolve_target(table, transition)
+                if target_id is None:
                     raise DefinitionError(
                         'invalid transition target "{}" in state "{}"'.format(
                             transition.target, state.name))
-                # internal transition mean target is None
-                if transition.target is not None:
-                    transition.target = target_state
+                transition.target = table.states[target_id]
 
         validate_states_names(state)
+        validate_regions(state)
         validate_event_names(state)
 
-    validate_states_are_reachable(state_paths.values())
-
-
-def parse(input_):
-    try:
-        parser = Lark.open('state_chart.lark',
-                           rel_to=__file__,
-                           parser='lalr',
-                           postlex=ScIndenter())
-        # all rules expect a newline at the end
-        # we just automatically add one at the end of the input
-        # in case the user hasn't added it
-        tree = parser.parse(input_ + '\n')
-        root_state = ScTransformer().transform(tree)
-        validate(root_state)
-        return root_state
-    except LarkError as exc:
-        raise ParsingError from exc
+    validate_states_are_reachable(table)
+    validate_timeouts(table)
+
+
+class Parser:
+    def __init__(self, cache=True, tree_less=True):
+        # with cache enabled, lark serializes the LALR tables to a temporary
+        # file keyed by the grammar, the options and the lark version
+        # when tree_less is set, the transformer callbacks are applied
+        # as soon as each rule is reduced so that no parse tree is built
+        self._tree_less = tree_less
+        self._lark = Lark.open(
+            'state_chart.lark',
+            rel_to=__file__,
+            parser='lalr',
+            postlex=ScIndenter(),
+            transformer=ScTransformer() if tree_less else None,
+            cache=cache)
+
+    def parse(self, input_, check=True):
+        # unchecked, the statechart is not validated
+        # and its transition targets are left unresolved
+        try:
+            # all rules expect a newline at the end
+            # we just automatically add one at the end of the input
+            # in case the user hasn't added it
+            result = self._lark.parse(input_ + '\n')
+            if self._tree_less:
+                root_state = result
+            else:
+                root_state = ScTransformer().transform(result)
+            name_timeouts(root_state)
+            root_state.index()
+            if check:
+                validate(root_state)
+            return root_state
+        except LarkError as exc:
+            raise ParsingError from exc
+
+
+_parser = None
+
+
+def get_parser():
+    global _parser
+    if _parser is None:
+        _parser = Parser()
+    return _parser
+
+
+def parse(input_, check=True):
+    return get_parser().parse(input_, check)
@@ -0,0 +1,43 @@
+class Regions:
+    # the event handlers of the regions and their substates return the
+    # depth of the innermost ancestor the transitions they took kept
+    # active, so that a parallel state stops handling an event once one
+    # of its regions is left, whether or not it is entered again
+    # the states whose entry may take the transitions of a transient
+    # state also return it from their init function, the depth kept so
+    # far being passed to them
+    def __init__(self, root_state):
+        self.depths = {}
+        self.in_region = set()
+        for state in root_state.all_states:
+            if state.is_root:
+                self.depths[state] = 0
+                continue
+            self.depths[state] = self.depths[state.parent] + 1
+            if state.is_region or state.parent in self.in_region:
+                self.in_region.add(state)
+        self.inits = set()
+        if self.in_region:
+            for state in reversed(root_state.all_states):
+                if state.is_parallel:
+                    entered = state.states
+                elif not state.is_atomic:
+                    entered = [state.initial]
+                else:
+                    entered = []
+                if state.is_transient or any(substate in self.inits
+                                             for substate in entered):
+                    self.inits.add(state)
+
+    def handler_returns_kept(self, state):
+        return state in self.in_region
+
+    def init_returns_kept(self, state):
+        return state in self.inits
+
+    def depth(self, state):
+        return self.depths[state]
+
+    def kept_depth(self, transition):
+        # the depth of the innermost ancestor not exited by the transition
+        return self.depths[transition.exit_states[-1]] - 1
@@ -0,0 +1,282 @@
+from .error import Error
+from .regions import Regions
+
+
+class _Undecided(Exception):
+    pass
+
+
+class _Run:
+    # a run of the generated switch code on the state fields, the actions
+    # being recorded and the guards being decided by the given outcomes
+    def __init__(self, program, fields, outcomes):
+        self.program = program
+        self.field_ids = program.field_ids
+        self.fields = list(fields)
+        self.outcomes = outcomes
+        self.decided = 0
+        self.actions = []
+        self.guard = None
+        self.transients = []
+        self.kept = 0
+
+    def decide(self, guard):
+        if self.decided == len(self.outcomes):
+            self.guard = guard
+            raise _Undecided
+        self.decided += 1
+        return self.outcomes[self.decided - 1]
+
+    def is_active(self, state):
+        state = state.exclusive_state
+        return self.fields[self.field_ids[state.parent]] is state
+
+    def init(self, state, recurse):
+        if state.is_transient:
+            if state in self.transients and not self.program.transient_cycles:
+                raise Error('transient state "{}" leads back to itself'.format(
+                    state.path))
+            self.transients.append(state)
+            self.react(state.event_handlers[0])
+            self.transients.pop()
+        elif state.parent and not state.is_region:
+            self.fields[self.field_ids[state.parent]] = state
+        self.actions.extend(self.program.init_actions(state))
+        if recurse:
+            if state.is_parallel:
+                for region in state.states:
+                    self.init(region, True)
+            elif not state.is_atomic:
+                self.init(state.initial, True)
+
+    def exit(self, state, recurse):
+        if recurse:
+            if state.is_parallel:
+                for region in state.states:
+                    self.exit(region, True)
+            elif not state.is_atomic:
+                substate = self.fields[self.field_ids[state]]
+                if substate is not None:
+                    self.exit(substate, True)
+        self.actions.extend(self.program.exit_actions(state))
+
+    def take(self, transition):
+        if transition.is_internal:
+            self.actions.extend(transition.actions)
+            return
+        for state, recurse in transition.exit_steps:
+            if not state.is_transient:
+                self.exit(state, recurse)
+        self.actions.extend(transition.actions)
+        self.kept = min(self.kept, self.program.regions.kept_depth(transition))
+        for state, recurse in transition.entry_steps:
+            self.init(state, recurse)
+
+    def react(self, event_handler):
+        for transition in event_handler.transitions:
+            if (transition.guard is None or transition.is_else_guard
+                    or self.decide(transition.guard)):
+                self.take(transition)
+                return
+
+    def handle(self, state, event):
+        # kept is left to the depth of the innermost ancestor the
+        # transitions taken kept active, as returned by the generated
+        # event handlers of the regions and their substates
+        regions = self.program.regions
+        tracked = regions.handler_returns_kept(state)
+        self.kept = regions.depth(state)
+        if state.has_field:
+            self.handle(self.fields[self.field_ids[state]], event)
+            if tracked and self.kept < regions.depth(state):
+                return
+        elif state.is_parallel:
+            # the regions handle the event in turn, until one of them is left
+            for region in state.states:
+                self.handle(region, event)
+                if self.kept < regions.depth(region):
+                    return
+        if (not tracked and state.has_field and state.parent
+                and state.event_handlers and not self.is_active(state)):
+            return
+        for event_handler in state.event_handlers:
+            if event_handler.event == event:
+                self.react(event_handler)
+                return
+
+
+class Program:
+    # the dispatch tables of a statechart, bound to python callables
+    # a configuration is the active substate of every active state having
+    # a field, the fields of the inactive states being cleared since the
+    # generated code only reads them in the step leaving these states
+    # rows[configuration][event] is the step taken on the event, compiled
+    # on first use: either a (actions, configuration) tuple, or a branch
+    # [actions, guard, step if true, step if false, outcomes, action count]
+    # whose steps are compiled once the guard is first evaluated
+    # guards and actions are called with the machine and the event, which
+    # is None on init, the actions not bound being ignored
+    # the timers, if any, are started on entry of the states with a timed
+    # event handler through timers.start_timer(machine, event, delay) and
+    # cancelled on their exit through timers.cancel_timer(machine, event)
+    # transient states leading back to themselves are only run when
+    # transient_cycles is set, their steps having no bounded compilation
+    transient_cycles = True
+
+    def __init__(self, root_state, guards={}, actions={}, timers=None):
+        self.root_state = root_state
+        self.regions = Regions(root_state)
+        self.events = list(root_state.event_names)
+        self.event_ids = {event: i for i, event in enumerate(self.events)}
+        self.fields = [
+            state for state in root_state.all_states if state.has_field
+        ]
+        self.field_ids = {state: i for i, state in enumerate(self.fields)}
+        self.guards = {}
+        self.actions = {}
+        for state in root_state.all_states:
+            for action in state.init_actions + state.exit_actions:
+                self._bind_action(action, actions)
+            for transition in state.transitions:
+                for action in transition.actions:
+                    self._bind_action(action, actions)
+                guard = transition.guard
+                if guard is None or transition.is_else_guard:
+                    continue
+                if guard not in guards:
+                    raise Error('guard "{}" is not bound'.format(guard))
+                self.guards[guard] = guards[guard]
+        self._timed = {}
+        if timers is not None:
+            for state in root_state.all_states:
+                for event_handler in state.event_handlers:
+                    if event_handler.timeout is not None:
+                        self._bind_timer(state, event_handler, timers)
+        self.configurations = []
+        self._configuration_ids = {}
+        self._active_states = []
+        self.rows = []
+        self.initial = self._compile(None, None, [], 0)
+
+    def _bind_action(self, action, actions):
+        if action in actions:
+            self.actions[action] = actions[action]
+
+    def _bind_timer(self, state, event_handler, timers):
+        event = event_handler.event
+        delay = event_handler.timeout
+        self._timed[state] = (('start', event), ('cancel', event))
+        self.actions['start', event] = lambda machine, event_: \
+            timers.start_timer(machine, event, delay)
+        self.actions['cancel', event] = lambda machine, event_: \
+            timers.cancel_timer(machine, event)
+
+    def init_actions(self, state):
+        if state not in self._timed:
+            return state.init_actions
+        return [self._timed[state][0]] + state.init_actions
+
+    def exit_actions(self, state):
+        if state not in self._timed:
+            return state.exit_actions
+        return [self._timed[state][1]] + state.exit_actions
+
+    def configuration_id(self, fields):
+        canonical = [None] * len(fields)
+        active = set()
+        states = [self.root_state]
+        while states:
+            state = states.pop()
+            active.add(state)
+            if state.is_parallel:
+                states.extend(state.states)
+            elif state.has_field:
+                i = self.field_ids[state]
+                canonical[i] = fields[i]
+                states.append(fields[i])
+        canonical = tuple(canonical)
+        if canonical not in self._configuration_ids:
+            self._configuration_ids[canonical] = len(self.configurations)
+            self.configurations.append(canonical)
+            self._active_states.append(frozenset(active))
+            self.rows.append([None] * len(self.events))
+        return self._configuration_ids[canonical]
+
+    def active_states(self, configuration):
+        return self._active_states[configuration]
+
+    def _compile(self, configuration, event, outcomes, count):
+        if configuration is None:
+            run = _Run(self, [None] * len(self.fields), outcomes)
+        else:
+            run = _Run(self, self.configurations[configuration], outcomes)
+        try:
+            if event is None:
+                run.init(self.root_state, True)
+            else:
+                run.handle(self.root_state, self.events[event])
+        except _Undecided:
+            return [
+                self._actions(run.actions[count:]), self.guards[run.guard],
+                None, None, (configuration, event, outcomes),
+                len(run.actions)
+            ]
+        return (self._actions(run.actions[count:]),
+                self.configuration_id(run.fields))
+
+    def _actions(self, actions):
+        return tuple(self.actions[action] for action in actions
+                     if action in self.actions)
+
+    def step(self, configuration, event):
+        step = self._compile(configuration, event, [], 0)
+        self.rows[configuration][event] = step
+        return step
+
+    def branch(self, step, outcome):
+        configuration, event, outcomes = step[4]
+        branch = self._compile(configuration, event, outcomes + [outcome],
+                               step[5])
+        step[2 if outcome else 3] = branch
+        return branch
+
+
+class Machine:
+    # a statechart instance, handling the events as the generated
+    # code of the switch dispatch does
+    def __init__(self, program):
+        self.program = program
+        self.configuration = None
+        self._run(program.initial, None)
+
+    def _run(self, step, event):
+        program = self.program
+        while len(step) != 2:
+            for action in step[0]:
+                action(self, event)
+            outcome = bool(step[1](self, event))
+            step = step[2 if outcome else 3] or program.branch(step, outcome)
+        for action in step[0]:
+            action(self, event)
+        self.configuration = step[1]
+
+    def send(self, event):
+        program = self.program
+        try:
+            event_id = program.event_ids[event]
+        except KeyError:
+            raise Error('unknown event "{}"'.format(event)) from None
+        step = (program.rows[self.configuration][event_id]
+                or program.step(self.configuration, event_id))
+        if len(step) == 2 and not step[0]:
+            self.configuration = step[1]
+        else:
+            self._run(step, event)
+
+    def send_all(self, events):
+        for event in events:
+            self.send(event)
+
+    def is_in(self, path):
+        state = self.program.root_state.state_paths[path]
+        return state in self.program.active_states(self.configuration)
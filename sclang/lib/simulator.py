@@ -0,0 +1,127 @@
+import numpy as np
+from .error import Error
+
+NOT_COMPILED = -1
+FALLBACK = -2
+ACTIONS = -3
+
+
+class Simulator:
+    # many instances of the same statechart advanced together, the active
+    # configuration of each being kept in one array of configuration ids
+    # transitions[configuration, event] is the configuration reached on the
+    # event, filled in as the steps of the program get compiled, ACTIONS
+    # when the step has actions but no guards, the instances taking the
+    # same such step running its actions together, or FALLBACK when the
+    # step has guards, the instances taking it running it one at a time
+    # the last column leaves the configurations as is, for the event -1
+    # the guards and actions of the program are called with an array of
+    # the indices of the instances taking their step in place of the
+    # machine, a guard being given a single index, whose outcome it
+    # returns
+    def __init__(self, program, count):
+        self.program = program
+        self.transitions = np.empty((0, len(program.events) + 1), np.int32)
+        initial = program.initial
+        if len(initial) == 2:
+            for action in initial[0]:
+                action(np.arange(count), None)
+            self.configurations = np.full(count, initial[1], np.int32)
+        else:
+            self.configurations = np.array(
+                [self._run(i, initial, None) for i in range(count)], np.int32)
+        self._grow()
+
+    def _grow(self):
+        count = len(self.transitions)
+        configuration_count = len(self.program.configurations)
+        if count == configuration_count:
+            return
+        transitions = np.full(
+            (configuration_count - count, self.transitions.shape[1]),
+            NOT_COMPILED, np.int32)
+        transitions[:, -1] = np.arange(count, configuration_count)
+        self.transitions = np.concatenate([self.transitions, transitions])
+
+    def _compile(self, configurations, events):
+        program = self.program
+        for configuration, event in np.unique(np.stack(
+                [configurations, events]), axis=1).T.tolist():
+            step = (program.rows[configuration][event]
+                    or program.step(configuration, event))
+            if len(step) == 2 and not step[0]:
+                self.transitions[configuration, event] = step[1]
+            elif len(step) == 2:
+                self.transitions[configuration, event] = ACTIONS
+            else:
+                self.transitions[configuration, event] = FALLBACK
+        self._grow()
+
+    def _run(self, index, step, event):
+        # the callables being given an array of indices on every step
+        program = self.program
+        indices = np.array([index])
+        while len(step) != 2:
+            for action in step[0]:
+                action(indices, event)
+            outcome = bool(step[1](indices, event))
+            step = step[2 if outcome else 3] or program.branch(step, outcome)
+        for action in step[0]:
+            action(indices, event)
+        return step[1]
+
+    def _run_actions(self, indices, events, configurations):
+        # grouped by step, the instances being sorted by configuration
+        # and event, then by index
+        program = self.program
+        keys = (self.configurations[indices].astype(np.int64) *
+                self.transitions.shape[1] + events[indices])
+        order = np.argsort(keys, kind='stable')
+        indices = indices[order]
+        keys, starts = np.unique(keys[order], return_index=True)
+        for key, group in zip(keys.tolist(),
+                              np.split(indices, starts[1:].tolist())):
+            configuration, event = divmod(key, self.transitions.shape[1])
+            actions, target = program.rows[configuration][event]
+            for action in actions:
+                action(group, program.events[event])
+            configurations[group] = target
+
+    def event_ids(self, events):
+        try:
+            return np.array(
+                [self.program.event_ids[event] for event in events], np.int32)
+        except KeyError as exc:
+            raise Error('unknown event "{}"'.format(exc.args[0])) from None
+
+    def step(self, events):
+        # events holds the id of the event handled by each instance
+        events = np.asarray(events)
+        configurations = self.transitions[self.configurations, events]
+        not_compiled = configurations == NOT_COMPILED
+        if not_compiled.any():
+            self._compile(self.configurations[not_compiled],
+                          events[not_compiled])
+            configurations = self.transitions[self.configurations, events]
+        actions = np.flatnonzero(configurations == ACTIONS)
+        if len(actions):
+            self._run_actions(actions, events, configurations)
+        fallback = np.flatnonzero(configurations == FALLBACK)
+        if len(fallback):
+            program = self.program
+            for index in fallback.tolist():
+                configuration = int(self.configurations[index])
+                event = int(events[index])
+                configurations[index] = self._run(
+                    index, program.rows[configuration][event],
+                    program.events[event])
+            self._grow()
+        self.configurations = configurations
+
+    def is_in(self, path):
+        state = self.program.root_state.state_paths[path]
+        active = np.array([
+            state in self.program.active_states(configuration)
+            for configuration in range(len(self.program.configurations))
+        ], bool)
+        return active[self.configurations]
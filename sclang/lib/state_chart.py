@@ -1,145 +1,372 @@
+from array import array
 from collections import OrderedDict
-from cached_property import cached_property
+from collections.abc import Sequence
+
+
+class StateRange(Sequence):
+    # read-only view on a slice of the pre-order state array,
+    # which is how the subtree of a state is represented
+    __slots__ = ('_states', '_start', '_stop')
+
+    def __init__(self, states, start, stop):
+        self._states = states
+        self._start = start
+        self._stop = stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('state index out of range')
+        return self._states[self._start + index]
+
+    def __iter__(self):
+        states = self._states
+        for i in range(self._start, self._stop):
+            yield states[i]
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            state is other_state for state, other_state in zip(self, other))
+
+    def __repr__(self):
+        return 'StateRange({!r})'.format(list(self))
+
+
+class AncestorIndex:
+    # constant time lowest common ancestor queries: for u < v in pre-order,
+    # u not being an ancestor of v, the lowest common ancestor of u and v is
+    # the parent of the shallowest state in (u, v], found in a sparse table
+    __slots__ = ('table', 'levels')
+
+    def __init__(self, table):
+        self.table = table
+        depths = table.depths
+        level = array('l', range(len(depths)))
+        self.levels = [level]
+        width = 1
+        while 2 * width <= len(depths):
+            level = array('l', (a if depths[a] <= depths[b] else b
+                                for a, b in zip(level, level[width:])))
+            self.levels.append(level)
+            width *= 2
+
+    def shallowest(self, start, stop):
+        depths = self.table.depths
+        k = (stop - start).bit_length() - 1
+        level = self.levels[k]
+        a = level[start]
+        b = level[stop - (1 << k)]
+        return a if depths[a] <= depths[b] else b
+
+    def common_ancestor(self, id_, other_id):
+        if id_ > other_id:
+            id_, other_id = other_id, id_
+        if other_id < self.table.ends[id_]:
+            return id_
+        return self.table.parents[self.shallowest(id_ + 1, other_id + 1)]
+
+
+class StateTable:
+    # array backed description of the whole state tree
+    # indexed by the state ids, which follow the pre-order
+    __slots__ = ('states', 'parents', 'depths', 'first_children', 'ends',
+                 'paths', 'state_paths', 'children', 'events',
+                 'event_offsets', '_ancestors')
+
+    def __init__(self, root_state):
+        self.states = []
+        self.parents = array('l')
+        self.depths = array('l')
+        self.first_children = array('l')
+        self.ends = array('l')
+        self.paths = []
+        self.state_paths = OrderedDict()
+        # (parent id, name) -> id, the root state having the parent id -1
+        self.children = {}
+        # the event names handled by every state, in pre-order,
+        # event_offsets[id] being the position of the first one of state id
+        self.events = []
+        self.event_offsets = array('l')
+        self._ancestors = None
+
+        stack = [(root_state, -1)]
+        while stack:
+            state, parent_id = stack.pop()
+            if state is None:
+                # all the descendants of parent_id have been visited
+                self.ends[parent_id] = len(self.states)
+                continue
+            id_ = len(self.states)
+            state.id = id_
+            state.table = self
+            if parent_id < 0:
+                path = state.name
+                depth = 0
+            else:
+                path = self.paths[parent_id] + '/' + state.name
+                depth = self.depths[parent_id] + 1
+            self.states.append(state)
+            self.parents.append(parent_id)
+            self.depths.append(depth)
+            self.first_children.append(id_ + 1 if state.states else -1)
+            self.ends.append(id_ + 1)
+            self.paths.append(path)
+            self.state_paths[path] = state
+            self.children[parent_id, state.name] = id_
+            self.event_offsets.append(len(self.events))
+            self.events.extend(event_handler.event
+                               for event_handler in state.event_handlers
+                               if event_handler.event is not None)
+            stack.append((None, id_))
+            stack.extend((substate, id_) for substate in reversed(state.states))
+        self.event_offsets.append(len(self.events))
+
+    @property
+    def ancestors(self):
+        if self._ancestors is None:
+            self._ancestors = AncestorIndex(self)
+        return self._ancestors
 
 
 class State:
+    __slots__ = ('name', 'states', 'event_handlers', 'init_actions',
+                 'exit_actions', 'parent', 'transitions', 'id', 'table',
+                 'unique_name', 'queue_capacity', 'queue_kind', 'is_region')
+
     def __init__(self,
                  name,
                  event_handlers=[],
                  states=[],
                  init_actions=[],
-                 exit_actions=[]):
+                 exit_actions=[],
+                 is_region=False):
         self.name = name
         self.states = states
         self.event_handlers = event_handlers
         self.init_actions = init_actions
         self.exit_actions = exit_actions
+        # an orthogonal region, active along with its sibling regions
+        # as long as their parallel parent state is
+        self.is_region = is_region
         self.parent = None
+        self.id = None
+        self.table = None
+        # the capacity and kind of the event queue of a root state, if any
+        self.queue_capacity = None
+        self.queue_kind = None
 
         for state in self.states:
             state.parent = self
+        self.transitions = []
         for event_handler in self.event_handlers:
             event_handler.state = self
+            self.transitions.extend(event_handler.transitions)
         for transition in self.transitions:
             transition.state = self
 
-    @cached_property
+    def index(self):
+        assert self.is_root
+        return StateTable(self)
+
+    def _table(self):
+        if self.table is None:
+            state = self
+            while state.parent is not None:
+                state = state.parent
+            state.index()
+        return self.table
+
+    @property
     def path(self):
-        elements = []
-        state = self
-        while not state.is_root:
-            elements.append(state.name)
-            state = state.parent
-        elements.append(state.name)
-        return '/'.join(reversed(elements))
+        return self._table().paths[self.id]
 
-    @cached_property
+    @property
     def path_elements(self):
         return self.path.split('/')
 
-    @cached_property
+    @property
     def all_states(self):
-        states = [self]
-        for state in self.states:
-            states.extend(state.all_states)
-        return states
-
-    @cached_property
-    def transitions(self):
-        transitions = []
-        for event_handler in self.event_handlers:
-            transitions.extend(event_handler.transitions)
-        return transitions
+        table = self._table()
+        return StateRange(table.states, self.id, table.ends[self.id])
 
-    @cached_property
+    @property
     def is_root(self):
         return self.parent is None
 
-    @cached_property
+    @property
     def is_initial(self):
-        if self.is_root:
+        if self.is_root or self.is_region:
             return True
         return self.parent.states[0] is self
 
-    @cached_property
+    @property
     def is_transient(self):
         return len(
             self.event_handlers) == 1 and self.event_handlers[0].event is None
 
-    @cached_property
+    @property
     def initial(self):
         assert not self.is_atomic
         return self.states[0]
 
-    @cached_property
+    @property
     def is_atomic(self):
         return len(self.states) == 0
 
-    @cached_property
+    @property
+    def is_parallel(self):
+        # the substates of a parallel state are all regions,
+        # which is checked by the parser
+        return len(self.states) > 0 and self.states[0].is_region
+
+    @property
+    def has_field(self):
+        # whether the statechart structure holds the active substate
+        return not self.is_atomic and not self.is_parallel
+
+    @property
+    def exclusive_state(self):
+        # the state itself, or the parallel state its regions belong to,
+        # whose value in its parent field tells whether it is active
+        state = self
+        while state.is_region:
+            state = state.parent
+        return state
+
+    @property
     def event_names(self):
-        events = set()
-        for event_handler in self.event_handlers:
-            if event_handler.event is not None:
-                events.add(event_handler.event)
-        for substate in self.states:
-            events.update(substate.event_names)
-        return events
+        # ordered by first occurrence so that the generated code
+        # doesn't depend on the string hash seed
+        table = self._table()
+        start = table.event_offsets[self.id]
+        stop = table.event_offsets[table.ends[self.id]]
+        return OrderedDict.fromkeys(table.events[start:stop]).keys()
 
-    @cached_property
+    @property
     def state_paths(self):
-        if self.parent is None:
-            paths = OrderedDict()
-            for state in self.all_states:
-                paths[state.path] = state
-            return paths
-        state = self.parent
-        while state.parent is not None:
-            state = state.parent
-        return state.state_paths
+        return self._table().state_paths
 
     def common_ancestor(self, other):
-        elts = self.path_elements
-        other_elts = other.path_elements
-        common_elts = []
-        for elt, other_elt in zip(elts, other_elts):
-            if elt == other_elt:
-                common_elts.append(elt)
-            else:
-                break
-        return self.state_paths['/'.join(common_elts)]
+        table = self._table()
+        return table.states[table.ancestors.common_ancestor(
+            self.id, other.id)]
 
     def states_to_ancestor(self, ancestor):
         if self is ancestor:
             return []
-        parent = self.parent
+        table = self._table()
+        parents = table.parents
         states = []
-        while parent not in [None, ancestor]:
-            states.append(parent)
-            parent = parent.parent
+        id_ = parents[self.id]
+        while id_ >= 0 and table.states[id_] is not ancestor:
+            states.append(table.states[id_])
+            id_ = parents[id_]
         return states
 
 
 class EventHandler:
-    def __init__(self, event, transitions):
+    __slots__ = ('event', 'transitions', 'state', 'timeout')
+
+    def __init__(self, event, transitions, timeout=None):
         self.event = event
         self.transitions = transitions
+        # the delay in milliseconds of a timed event handler, whose
+        # event is raised when it expires after the state is entered
+        self.timeout = timeout
         for transition in self.transitions:
             transition.event_handler = self
 
-    @cached_property
+    @property
+    def label(self):
+        if self.timeout is not None:
+            return 'after({}ms)'.format(self.timeout)
+        return self.event
+
+    @property
     def is_unguarded(self):
         return len(self.transitions) == 1 and self.transitions[0].guard is None
 
 
 class Transition:
+    __slots__ = ('target', 'guard', 'actions', 'state', 'event_handler',
+                 '_exit_states', '_entry_states')
+
     else_guard = object()
 
     def __init__(self, target, guard=None, actions=[]):
         self.target = target
         self.guard = guard
         self.actions = actions
+        self._exit_states = None
+        self._entry_states = None
+
+    def _compute_path(self):
+        assert not self.is_internal
+        common_ancestor = self.state.common_ancestor(self.target)
+        # the regions of a parallel state are left and entered together,
+        # so that a transition between them leaves the parallel state
+        while common_ancestor is not None and common_ancestor.is_parallel:
+            common_ancestor = common_ancestor.parent
+        self._exit_states = [self.state] + self.state.states_to_ancestor(
+            common_ancestor)
+        entry_states = [self.target] + self.target.states_to_ancestor(
+            common_ancestor)
+        entry_states.reverse()
+        self._entry_states = entry_states
+
+    @property
+    def exit_states(self):
+        # the states exited by the transition, innermost first
+        if self._exit_states is None:
+            self._compute_path()
+        return self._exit_states
+
+    @property
+    def entry_states(self):
+        # the states entered by the transition, outermost first
+        if self._entry_states is None:
+            self._compute_path()
+        return self._entry_states
+
+    @property
+    def exit_steps(self):
+        # the exited states, each with whether its active substates are
+        # exited first, the other regions of the left parallel states
+        # being exited along
+        steps = []
+        previous = None
+        for state in self.exit_states:
+            if previous is not None and state.is_parallel:
+                steps.extend((region, True) for region in state.states
+                             if region is not previous)
+            steps.append((state, previous is None))
+            previous = state
+        return steps
+
+    @property
+    def entry_steps(self):
+        # the entered states, each with whether its initial substates are
+        # entered next, the other regions of the entered parallel states
+        # being entered along
+        states = self.entry_states
+        steps = []
+        for i, state in enumerate(states):
+            last = i == len(states) - 1
+            steps.append((state, last))
+            if not last and state.is_parallel:
+                steps.extend((region, True) for region in state.states
+                             if region is not states[i + 1])
+        return steps
 
-    @cached_property
+    @property
     def is_else_guard(self):
         return self.guard is Transition.else_guard
 
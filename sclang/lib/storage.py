@@ -0,0 +1,66 @@
+from .tables import index_type
+
+storages = ['enum', 'compact', 'bitfield']
+
+
+def type_size(type_):
+    return int(type_[len('uint'):-len('_t')]) // 8
+
+
+class StateStorage:
+    # how the state fields of the statechart structure are declared,
+    # either with their enum type, with the smallest unsigned type
+    # able to hold their values or as bitfields
+    # the bitfields are declared with a fixed width type, which C99 leaves
+    # to the implementation to accept, so that they are packed in units
+    # smaller than an unsigned int
+    # size is an upper bound on the size of the structure, assuming
+    # the fixed width types are naturally aligned and the bitfields
+    # don't straddle their type boundaries
+    def __init__(self, storage, value_counts, queue=None):
+        self.storage = storage
+        self.size = None
+        if storage == 'compact':
+            field_sizes = [(type_size(index_type(count - 1)), 1)
+                           for count in value_counts]
+        elif storage == 'bitfield':
+            bits = [self.bits(count) for count in value_counts]
+            self.bitfield_type = index_type(2**sum(bits) - 1) if sum(
+                bits) <= 32 else 'uint32_t'
+            unit_bits = 8 * type_size(self.bitfield_type)
+            units = 1
+            used = 0
+            for field_bits in bits:
+                if used + field_bits > unit_bits:
+                    units += 1
+                    used = 0
+                used += field_bits
+            field_sizes = [(unit_bits // 8, units)]
+        else:
+            return
+        if queue is not None:
+            field_sizes += queue.field_sizes
+        size = 0
+        alignment = 1
+        for field_size, count in field_sizes:
+            size += -size % field_size + field_size * count
+            alignment = max(alignment, field_size)
+        self.size = size + -size % alignment
+
+    @staticmethod
+    def value_count(state):
+        # the number of enum values of the field of a composite state
+        return sum(1 for substate in state.states
+                   if not substate.is_transient)
+
+    @staticmethod
+    def bits(count):
+        return max(1, (count - 1).bit_length())
+
+    def field(self, enum_type, name, count):
+        if self.storage == 'compact':
+            return '{} {}'.format(index_type(count - 1), name)
+        if self.storage == 'bitfield':
+            return '{} {} : {}'.format(self.bitfield_type, name,
+                                       self.bits(count))
+        return '{} {}'.format(enum_type, name)
@@ -0,0 +1,156 @@
+from collections import namedtuple
+from .state_chart import Transition
+
+StateInfo = namedtuple('StateInfo', [
+    'state', 'parent', 'transitions', 'composite', 'value', 'transition_count',
+    'init', 'exit', 'transient', 'exits'
+])
+
+CompositeInfo = namedtuple('CompositeInfo', ['state', 'initial', 'substates'])
+
+TransitionInfo = namedtuple('TransitionInfo', [
+    'state', 'target', 'event', 'guard', 'action', 'exit_count', 'entry_count'
+])
+
+
+def index_type(max_value):
+    for bits in [8, 16, 32]:
+        if max_value < 2**bits:
+            return 'uint{}_t'.format(bits)
+    raise ValueError('statechart too large')
+
+
+class StateChartTables:
+    # the rows of the const tables walked by the table driven C code
+    # states are indexed by their pre-order id, guards and actions
+    # by their position in the guards and actions lists plus one,
+    # 0 standing for no guard or no action
+    # the exited states are the exit_count first states from the source
+    # state up, the entered ones the entry_count first states from the
+    # target up, so only the target is stored
+    def __init__(self, root_state, timers=None):
+        self.root_state = root_state
+        self.timers = timers
+        self.states = []
+        self.composites = []
+        self.substates = []
+        self.transitions = []
+        self.guards = []
+        self.actions = []
+        self._guard_indices = {}
+        self._action_indices = {}
+        values = {}
+        # whether a state or one of its descendants has exit actions,
+        # leaving a state being a no-op otherwise
+        exits = [
+            bool(self.exit_actions(state)) for state in root_state.all_states
+        ]
+        for state in reversed(root_state.all_states):
+            if exits[state.id] and state.parent:
+                exits[state.parent.id] = True
+        events = {
+            event: value
+            for value, event in enumerate(root_state.event_names)
+        }
+        for state in root_state.all_states:
+            if state.is_atomic:
+                composite = None
+            else:
+                composite = len(self.composites)
+                self.composites.append(
+                    CompositeInfo(state=state,
+                                  initial=state.initial.id,
+                                  substates=len(self.substates)))
+                for substate in state.states:
+                    if not substate.is_transient:
+                        # the enum value held by the field of the state
+                        values[substate.id] = len(
+                            self.substates) - self.composites[-1].substates
+                        self.substates.append(substate.id)
+            first_transition = len(self.transitions)
+            for event_handler in state.event_handlers:
+                for transition in event_handler.transitions:
+                    self.add_transition(state,
+                                        events.get(event_handler.event, 0),
+                                        transition)
+            self.states.append(
+                StateInfo(state=state,
+                          parent=state.parent.id if state.parent else None,
+                          transitions=first_transition,
+                          composite=composite,
+                          value=values.get(state.id, 0),
+                          transition_count=len(self.transitions) -
+                          first_transition,
+                          init=self.action_index(self.init_actions(state)),
+                          exit=self.action_index(self.exit_actions(state)),
+                          transient=state.is_transient,
+                          exits=exits[state.id]))
+
+        # the no state and no composite values are one past the last ones
+        self.state_type = index_type(len(self.states))
+        self.composite_type = index_type(len(self.composites))
+        self.substate_type = index_type(len(self.substates))
+        self.transition_type = index_type(len(self.transitions))
+        self.event_type = index_type(len(events))
+        self.guard_type = index_type(len(self.guards))
+        self.action_type = index_type(len(self.actions))
+        self.value_type = index_type(
+            max([len(composite.state.states)
+                 for composite in self.composites] + [0]))
+        self.count_type = index_type(
+            max([row.transition_count for row in self.states] +
+                [row.exit_count for row in self.transitions] +
+                [row.entry_count for row in self.transitions]))
+        # the exit and entry counts share a byte unless the chart is deep
+        self.packed_counts = all(
+            row.exit_count < 16 and row.entry_count < 16
+            for row in self.transitions)
+        # the field offsets are bounded by the size of the statechart
+        # structure, which holds one enum per composite state
+        self.field_type = index_type(8 * len(self.composites))
+        self.max_entry_count = max(
+            [row.entry_count for row in self.transitions] + [1])
+
+    def guard_index(self, guard):
+        if guard is None or guard is Transition.else_guard:
+            return 0
+        if guard not in self._guard_indices:
+            self.guards.append(guard)
+            self._guard_indices[guard] = len(self.guards)
+        return self._guard_indices[guard]
+
+    def init_actions(self, state):
+        if self.timers is None:
+            return state.init_actions
+        return self.timers.init_actions(state)
+
+    def exit_actions(self, state):
+        if self.timers is None:
+            return state.exit_actions
+        return self.timers.exit_actions(state)
+
+    def action_index(self, actions):
+        if not actions:
+            return 0
+        key = tuple(actions)
+        if key not in self._action_indices:
+            self.actions.append(list(actions))
+            self._action_indices[key] = len(self.actions)
+        return self._action_indices[key]
+
+    def add_transition(self, state, event, transition):
+        if transition.is_internal:
+            target = None
+            exit_count = entry_count = 0
+        else:
+            target = transition.target.id
+            exit_count = len(transition.exit_states)
+            entry_count = len(transition.entry_states)
+        self.transitions.append(
+            TransitionInfo(state=state,
+                           target=target,
+                           event=event,
+                           guard=self.guard_index(transition.guard),
+                           action=self.action_index(transition.actions),
+                           exit_count=exit_count,
+                           entry_count=entry_count))
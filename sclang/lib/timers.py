@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from .tables import index_type
+
+
+class Timers:
+    # the timers started on entry of the states with a timed event handler
+    # and cancelled on their exit, through actions prepended to the init
+    # and exit actions of these states
+    # the timers are indexed so that the states never active together
+    # share the same timer, the exclusive substates of a state starting
+    # at the same index and the regions of a parallel state one after
+    # the other
+    def __init__(self, root_state, style):
+        self.root_state = root_state
+        self.indices = OrderedDict()
+        self.event_handlers = {}
+        # the number of timers needed by each state and its substates
+        counts = {}
+        for state in reversed(root_state.all_states):
+            count = [counts[substate] for substate in state.states]
+            count = sum(count) if state.is_parallel else max(count, default=0)
+            for event_handler in state.event_handlers:
+                if event_handler.timeout is not None:
+                    self.event_handlers[state] = event_handler
+                    count += 1
+            counts[state] = count
+        starts = {root_state: 0}
+        for state in root_state.all_states:
+            start = starts[state]
+            if state in self.event_handlers:
+                self.indices[state] = start
+                start += 1
+            for substate in state.states:
+                starts[substate] = start
+                if state.is_parallel:
+                    start += counts[substate]
+        self.count = counts[root_state]
+        # a timer finds its statechart from its index
+        self.index_type = index_type(max(self.count - 1, 0))
+        self.style = style
+        ns = root_state.name
+        self.pointer = style['pointer']('sc')
+        self.start = style['function'](ns, 'timer', 'start')
+        self.cancel = style['function'](ns, 'timer', 'cancel')
+        self.ticks = style['constant'](ns, 'timer', 'ticks')
+
+    def init_actions(self, state):
+        if state not in self.indices:
+            return state.init_actions
+        event_handler = self.event_handlers[state]
+        return ['{}({}, {}, {}, {}({}))'.format(
+            self.start, self.pointer, self.indices[state],
+            self.style['constant'](self.root_state.name, 'evt',
+                                   event_handler.event), self.ticks,
+            event_handler.timeout)] + state.init_actions
+
+    def exit_actions(self, state):
+        if state not in self.indices:
+            return state.exit_actions
+        return ['{}({}, {})'.format(self.cancel, self.pointer,
+                                    self.indices[state])] + state.exit_actions
@@ -1,4 +1,20 @@
+import os
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
+
+
+class BuildPyCommand(build_py):
+    def run(self):
+        super().run()
+        # ship the templates precompiled when jinja2 is available
+        try:
+            from sclang.lib.environment import compile_templates
+        except ImportError:
+            return
+        compile_templates(
+            os.path.join(self.build_lib, 'sclang', 'lib',
+                         'compiled_templates'))
+
 
 setup(
     name='sclang',
@@ -11,13 +27,15 @@ setup(
     long_description='sclang is a compact declarative language for describing statecharts.',
     url='https://github.com/alexis-boisserand/sclang',
     install_requires=[
-        'cached-property>=1.5',
         'lark-parser>=0.8',
         'Jinja2>=2.11'
     ],
     extras_require={
         'dev': [
             'pytest>=5.3.5'
+        ],
+        'numpy': [
+            'numpy>=1.17'
         ]
     },
     python_requires='>=3.5',
@@ -26,5 +44,6 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent'
     ],
-    include_package_data=True
+    include_package_data=True,
+    cmdclass={'build_py': BuildPyCommand}
 )
@@ -0,0 +1,34 @@
+/parallel
+#init
+  "init_ = 0"
+  "exit_ = 0"
+Off
+  @power -> On
+On
+  #init
+    "init_ |= 0x1"
+  #exit
+    "exit_ |= 0x1"
+  @power -> Off
+  || Caps
+    #exit
+      "exit_ |= 0x2"
+    CapsOff
+      @caps_lock -> CapsOn
+      @cross -> ../Num/NumOn
+    CapsOn
+      #init
+        "init_ |= 0x4"
+      @caps_lock -> CapsOff
+      @num_lock -> ../../Off
+  || Num
+    #init
+      "init_ |= 0x8"
+    NumOff
+      @num_lock -> NumOn
+    NumOn
+      #exit
+        "exit_ |= 0x10"
+      @num_lock -> NumOff
+      @caps_lock -> ../Caps/CapsOn
+      @cross -> NumOff
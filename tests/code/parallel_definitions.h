@@ -0,0 +1,9 @@
+#ifndef PARALLEL_DEFINITIONS_H
+#define PARALLEL_DEFINITIONS_H
+
+#include <stdint.h>
+
+extern uint32_t init_;
+extern uint32_t exit_;
+
+#endif
\ No newline at end of file
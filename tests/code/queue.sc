@@ -0,0 +1,9 @@
+/queue
+#queue 3
+Idle
+  @START -> Running
+    "queue_post(sc, QUEUE_EVT_STEP)"
+Running
+  @STEP --
+    "steps++"
+  @STOP -> Idle
@@ -0,0 +1,6 @@
+#ifndef QUEUE_DEFINITIONS_H
+#define QUEUE_DEFINITIONS_H
+
+extern int steps;
+
+#endif // QUEUE_DEFINITIONS_H
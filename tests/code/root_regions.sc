@@ -0,0 +1,11 @@
+/root_regions
+|| Left
+  LeftOff
+    @cross -> ../Right/RightOn
+  LeftOn
+    @cross -> LeftOff
+|| Right
+  RightOff
+    @cross -> ../Left/LeftOn
+  RightOn
+    @cross -> RightOff
@@ -0,0 +1,4 @@
+#ifndef ROOT_REGIONS_DEFINITIONS_H
+#define ROOT_REGIONS_DEFINITIONS_H
+
+#endif
@@ -0,0 +1,12 @@
+/spsc
+#queue 4 spsc
+Even
+  @ODD -> Odd
+    "receive()"
+  @EVEN --
+    "errors++"
+Odd
+  @EVEN -> Even
+    "receive()"
+  @ODD --
+    "errors++"
@@ -0,0 +1,8 @@
+#ifndef SPSC_DEFINITIONS_H
+#define SPSC_DEFINITIONS_H
+
+extern unsigned errors;
+
+void receive(void);
+
+#endif // SPSC_DEFINITIONS_H
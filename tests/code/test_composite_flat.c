@@ -0,0 +1,51 @@
+#include "composite.h"
+
+#include <assert.h>
+
+uint32_t init_ = 0;
+uint32_t exit_ = 0;
+
+int main(int argc, char** argv)
+{
+    composite_sc_t sc;
+    composite_init(&sc);
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO_LEVEL_ONE));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO_LEVEL_ONE_LEVEL_TWO));
+    assert(init_ == (0x1 | 0x2 | 0x4));
+    assert(exit_ == 0);
+    composite_handle_event(&sc, COMPOSITE_EVT_EVENT_THREE);
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO_LEVEL_ONE));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO_LEVEL_ONE_LEVEL_TWO_ONE));
+    assert(exit_ == 0x4);
+    composite_handle_event(&sc, COMPOSITE_EVT_RESET);
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO_LEVEL_ONE));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO_LEVEL_ONE_LEVEL_TWO));
+    assert(init_ == (0x1 | 0x2 | 0x4));
+    assert(exit_ == 0);
+    composite_handle_event(&sc, COMPOSITE_EVT_EVENT_TWO);
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO_LEVEL_ONE_TWO));
+    assert(init_ == (0x1 | 0x2 | 0x4));
+    assert(exit_ == (0x2 | 0x4));
+    composite_handle_event(&sc, COMPOSITE_EVT_RESET);
+    composite_handle_event(&sc, COMPOSITE_EVT_EVENT_THREE);
+    exit_ = 0;
+    composite_handle_event(&sc, COMPOSITE_EVT_EVENT_TWO);
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO_LEVEL_ONE_THREE));
+    assert(exit_ == (0x2));
+    composite_handle_event(&sc, COMPOSITE_EVT_RESET);
+    composite_handle_event(&sc, COMPOSITE_EVT_EVENT_ONE);
+    assert(init_ == (0x1 | 0x2 | 0x4));
+    assert(exit_ == (0x2 | 0x4));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO));
+    assert(composite_is_in(&sc, COMPOSITE_ST_LEVEL_ZERO_LEVEL_ONE_TWO));
+    composite_handle_event(&sc, COMPOSITE_EVT_RESET);
+    composite_handle_event(&sc, COMPOSITE_EVT_EVENT_ONE);
+    composite_handle_event(&sc, COMPOSITE_EVT_EVENT_FOUR);
+    assert(exit_ == (0x2|0x4|0x8));
+    return 0;
+}
\ No newline at end of file
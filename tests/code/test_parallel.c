@@ -0,0 +1,50 @@
+#include "parallel.h"
+
+#include <assert.h>
+
+uint32_t init_ = 0;
+uint32_t exit_ = 0;
+
+int main(int argc, char** argv)
+{
+    parallel_sc_t sc;
+    parallel_init(&sc);
+    assert(sc.state == PARALLEL_ST_OFF);
+    parallel_handle_event(&sc, PARALLEL_EVT_POWER);
+    // both regions are entered
+    assert(sc.state == PARALLEL_ST_ON);
+    assert(sc.on_caps_state == PARALLEL_ST_ON_CAPS_CAPS_OFF);
+    assert(sc.on_num_state == PARALLEL_ST_ON_NUM_NUM_OFF);
+    assert(init_ == (0x1 | 0x8));
+    // each region handles the events independently
+    parallel_handle_event(&sc, PARALLEL_EVT_NUM_LOCK);
+    assert(sc.on_caps_state == PARALLEL_ST_ON_CAPS_CAPS_OFF);
+    assert(sc.on_num_state == PARALLEL_ST_ON_NUM_NUM_ON);
+    parallel_handle_event(&sc, PARALLEL_EVT_CAPS_LOCK);
+    // the transition from a region to the other leaves the parallel state
+    assert(sc.state == PARALLEL_ST_ON);
+    assert(sc.on_caps_state == PARALLEL_ST_ON_CAPS_CAPS_ON);
+    assert(sc.on_num_state == PARALLEL_ST_ON_NUM_NUM_OFF);
+    assert(exit_ == (0x1 | 0x2 | 0x10));
+    assert(init_ == (0x1 | 0x4 | 0x8));
+    // the other regions don't handle the event once the state is left
+    exit_ = 0;
+    parallel_handle_event(&sc, PARALLEL_EVT_NUM_LOCK);
+    assert(sc.state == PARALLEL_ST_OFF);
+    assert(sc.on_num_state == PARALLEL_ST_ON_NUM_NUM_OFF);
+    assert(exit_ == (0x1 | 0x2));
+    parallel_handle_event(&sc, PARALLEL_EVT_POWER);
+    parallel_handle_event(&sc, PARALLEL_EVT_NUM_LOCK);
+    exit_ = 0;
+    parallel_handle_event(&sc, PARALLEL_EVT_POWER);
+    assert(sc.state == PARALLEL_ST_OFF);
+    assert(exit_ == (0x1 | 0x2 | 0x10));
+    // the regions following the one leaving the parallel state don't
+    // handle the event, even though the state is entered again
+    parallel_handle_event(&sc, PARALLEL_EVT_POWER);
+    parallel_handle_event(&sc, PARALLEL_EVT_CROSS);
+    assert(sc.state == PARALLEL_ST_ON);
+    assert(sc.on_caps_state == PARALLEL_ST_ON_CAPS_CAPS_OFF);
+    assert(sc.on_num_state == PARALLEL_ST_ON_NUM_NUM_ON);
+    return 0;
+}
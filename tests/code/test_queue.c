@@ -0,0 +1,46 @@
+#include "queue.h"
+
+#include <assert.h>
+
+int steps;
+
+int main(int argc, char** argv)
+{
+    queue_sc_t sc;
+    bool posted;
+    queue_init(&sc);
+    posted = queue_post(&sc, QUEUE_EVT_START);
+    assert(posted);
+    assert(sc.state == QUEUE_ST_IDLE);
+    // the event posted by the transition action is handled in the same run
+    queue_process(&sc);
+    assert(sc.state == QUEUE_ST_RUNNING);
+    assert(steps == 1);
+
+    posted = queue_post(&sc, QUEUE_EVT_STEP);
+    assert(posted);
+    posted = queue_post(&sc, QUEUE_EVT_STEP);
+    assert(posted);
+    posted = queue_post(&sc, QUEUE_EVT_STEP);
+    assert(posted);
+    posted = queue_post(&sc, QUEUE_EVT_STOP);
+    assert(!posted);
+    queue_process(&sc);
+    assert(steps == 4);
+
+    // the events wrap around the end of the queue
+    posted = queue_post(&sc, QUEUE_EVT_STOP);
+    assert(posted);
+    posted = queue_post(&sc, QUEUE_EVT_START);
+    assert(posted);
+    queue_process(&sc);
+    assert(sc.state == QUEUE_ST_RUNNING);
+    assert(steps == 5);
+
+    posted = queue_post(&sc, QUEUE_EVT_STOP);
+    assert(posted);
+    queue_init(&sc);
+    queue_process(&sc);
+    assert(sc.state == QUEUE_ST_IDLE);
+    return 0;
+}
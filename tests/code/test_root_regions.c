@@ -0,0 +1,16 @@
+#include "root_regions.h"
+
+#include <assert.h>
+
+int main(int argc, char** argv)
+{
+    root_regions_sc_t sc;
+    root_regions_init(&sc);
+    assert(sc.left_state == ROOT_REGIONS_ST_LEFT_LEFT_OFF);
+    assert(sc.right_state == ROOT_REGIONS_ST_RIGHT_RIGHT_OFF);
+    // the right region doesn't handle the event once the left one is left
+    root_regions_handle_event(&sc, ROOT_REGIONS_EVT_CROSS);
+    assert(sc.left_state == ROOT_REGIONS_ST_LEFT_LEFT_OFF);
+    assert(sc.right_state == ROOT_REGIONS_ST_RIGHT_RIGHT_ON);
+    return 0;
+}
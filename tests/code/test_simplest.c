@@ -15,5 +15,20 @@ int main(int argc, char** argv)
     assert(sc.state == SIMPLEST_ST_OFF);
     simplest_handle_event(&sc, SIMPLEST_EVT_PRESS);
     assert(sc.state == SIMPLEST_ST_ON);
+
+    const simplest_event_t events[] = {SIMPLEST_EVT_TIMEOUT, SIMPLEST_EVT_PRESS, SIMPLEST_EVT_TIMEOUT};
+    simplest_handle_events(&sc, events, 3);
+    assert(sc.state == SIMPLEST_ST_OFF);
+    simplest_handle_events(&sc, events, 0);
+    assert(sc.state == SIMPLEST_ST_OFF);
+
+    simplest_sc_t scs[3];
+    simplest_init(&scs[0]);
+    simplest_init(&scs[1]);
+    simplest_init(&scs[2]);
+    simplest_step_all(scs, events, 3);
+    assert(scs[0].state == SIMPLEST_ST_OFF);
+    assert(scs[1].state == SIMPLEST_ST_ON);
+    assert(scs[2].state == SIMPLEST_ST_OFF);
     return 0;
 }
\ No newline at end of file
@@ -0,0 +1,55 @@
+#include "spsc.h"
+
+#include <assert.h>
+#include <pthread.h>
+#include <sched.h>
+
+#define EVENT_COUNT 100000
+
+static spsc_sc_t sc;
+static int values[EVENT_COUNT];
+static unsigned received;
+unsigned errors;
+
+void receive(void)
+{
+    // written by the producer before posting the event
+    if (values[received] != (int)received)
+    {
+        errors++;
+    }
+    received++;
+}
+
+static void* produce(void* arg)
+{
+    unsigned i;
+    for (i = 0; i < EVENT_COUNT; i++)
+    {
+        values[i] = (int)i;
+        while (!spsc_post(&sc, i % 2 == 0 ? SPSC_EVT_ODD : SPSC_EVT_EVEN))
+        {
+            sched_yield();
+        }
+    }
+    return NULL;
+}
+
+int main(int argc, char** argv)
+{
+    pthread_t producer;
+    int result;
+    spsc_init(&sc);
+    result = pthread_create(&producer, NULL, produce, NULL);
+    assert(result == 0);
+    while (received < EVENT_COUNT)
+    {
+        spsc_process(&sc);
+        sched_yield();
+    }
+    result = pthread_join(producer, NULL);
+    assert(result == 0);
+    assert(errors == 0);
+    assert(sc.state == SPSC_ST_EVEN);
+    return 0;
+}
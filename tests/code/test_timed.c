@@ -0,0 +1,78 @@
+#include "timed.h"
+
+#include <assert.h>
+
+#define SC_COUNT 1000
+
+static timed_timer_wheel_t wheel;
+static timed_sc_t scs[SC_COUNT];
+static int states[SC_COUNT];
+
+void entered(const void* sc, int state)
+{
+    states[(const timed_sc_t*)sc - scs] = state;
+}
+
+static void tick_until(uint32_t now)
+{
+    while (wheel.now < now)
+    {
+        timed_timer_wheel_tick(&wheel);
+    }
+}
+
+int main(int argc, char** argv)
+{
+    int i;
+    timed_timer_wheel_init(&wheel);
+    timed_init(&scs[0], &wheel);
+    assert(states[0] == IDLE);
+    tick_until(99);
+    assert(states[0] == IDLE);
+    tick_until(100);
+    assert(states[0] == SLOW);
+    tick_until(2099);
+    assert(states[0] == SLOW);
+    tick_until(2100);
+    assert(states[0] == FAST);
+    tick_until(5100);
+    assert(states[0] == IDLE);
+
+    // the timers are cancelled when their state is exited
+    tick_until(5150);
+    timed_handle_event(&scs[0], TIMED_EVT_START);
+    assert(states[0] == SLOW);
+    tick_until(6000);
+    timed_handle_event(&scs[0], TIMED_EVT_STOP);
+    assert(states[0] == IDLE);
+    tick_until(6100);
+    assert(states[0] == SLOW);
+    tick_until(7150);
+    assert(states[0] == SLOW);
+    tick_until(8100);
+    assert(states[0] == FAST);
+
+    // the statecharts share the wheel, each one with its own timers
+    for (i = 1; i < SC_COUNT + 100; i++)
+    {
+        tick_until(8100 + i);
+        if (i < SC_COUNT)
+        {
+            timed_init(&scs[i], &wheel);
+        }
+        if (i >= 100 && i < SC_COUNT + 99)
+        {
+            assert(states[i - 99] == IDLE);
+        }
+        if (i > 100)
+        {
+            assert(states[i - 100] == SLOW);
+        }
+    }
+    tick_until(8100 + SC_COUNT + 2100);
+    for (i = 1; i < SC_COUNT; i++)
+    {
+        assert(states[i] == FAST);
+    }
+    return 0;
+}
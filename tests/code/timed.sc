@@ -0,0 +1,16 @@
+/timed
+Idle
+  #init
+    "entered(sc, IDLE)"
+  @after(100ms) -> Running
+  @START -> Running
+Running
+  @after(5s) -> Idle
+  @STOP -> Idle
+  Slow
+    #init
+      "entered(sc, SLOW)"
+    @after(2s) -> Fast
+  Fast
+    #init
+      "entered(sc, FAST)"
@@ -0,0 +1,13 @@
+#ifndef TIMED_DEFINITIONS_H
+#define TIMED_DEFINITIONS_H
+
+enum
+{
+    IDLE,
+    SLOW,
+    FAST
+};
+
+void entered(const void* sc, int state);
+
+#endif // TIMED_DEFINITIONS_H
@@ -0,0 +1,180 @@
+import os
+import json
+import pytest
+import sclang.lib.build as build_module
+from sclang.lib.build import find_state_charts, build, write_depfile, write_manifest
+from sclang.lib.code import template_dependencies
+
+valid_input = '''
+/{}
+off
+  @BUTTON_PRESS -> on
+on
+  @TIMEOUT -> off
+'''
+
+
+def write_state_chart(path, name):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(valid_input.format(name))
+    return str(path)
+
+
+def test_find_state_charts(tmp_path):
+    first = write_state_chart(tmp_path / 'charts' / 'first.sc', 'first')
+    second = write_state_chart(tmp_path / 'charts' / 'sub' / 'second.sc',
+                               'second')
+    third = write_state_chart(tmp_path / 'third.sc', 'third')
+    (tmp_path / 'charts' / 'notes.txt').write_text('')
+
+    paths, missing = find_state_charts([str(tmp_path / 'charts')])
+    assert paths == [first, second]
+    assert missing == []
+
+    paths, missing = find_state_charts(
+        [third, str(tmp_path / '*.sc'),
+         str(tmp_path / 'nothing*.sc')])
+    assert paths == [third]
+    assert missing == [str(tmp_path / 'nothing*.sc')]
+
+    paths, missing = find_state_charts(
+        [str(tmp_path / 'charts' / 'sub'),
+         str(tmp_path / 'charts')])
+    assert paths == [second, first]
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_build(tmp_path, jobs):
+    paths = [
+        write_state_chart(tmp_path / 'first.sc', 'first'),
+        str(tmp_path / 'garbage.sc'),
+        str(tmp_path / 'missing.sc'),
+        write_state_chart(tmp_path / 'second.sc', 'second'),
+    ]
+    (tmp_path / 'garbage.sc').write_text('%khcvbk')
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+
+    results = build(paths, str(output_dir), jobs)
+    assert results[0].error is None
+    assert results[1].error is not None
+    assert results[2].error is not None
+    assert results[3].error is None
+    assert sorted(os.listdir(str(output_dir))) == [
+        '.sclang_cache.json', 'first.c', 'first.h', 'second.c', 'second.h'
+    ]
+
+
+def test_build_unexpected_error(tmp_path, monkeypatch):
+    paths = [
+        write_state_chart(tmp_path / 'first.sc', 'first'),
+        write_state_chart(tmp_path / 'second.sc', 'second'),
+    ]
+    code = build_module.code
+
+    def failing_code(root_state, *args, **kwargs):
+        if root_state.name == 'first':
+            raise RecursionError('maximum recursion depth exceeded')
+        return code(root_state, *args, **kwargs)
+
+    monkeypatch.setattr(build_module, 'code', failing_code)
+    results = build(paths, str(tmp_path), 1)
+    assert results[0].error == \
+        'RecursionError: maximum recursion depth exceeded'
+    assert results[1].error is None
+
+
+def test_build_cache(tmp_path):
+    paths = [
+        write_state_chart(tmp_path / 'first.sc', 'first'),
+        write_state_chart(tmp_path / 'second.sc', 'second'),
+    ]
+    output_dir = str(tmp_path)
+
+    results = build(paths, output_dir, 1)
+    assert [result.cached for result in results] == [False, False]
+    assert results[0].outputs == [
+        str(tmp_path / 'first.h'), str(tmp_path / 'first.c')
+    ]
+
+    results = build(paths, output_dir, 1)
+    assert [result.cached for result in results] == [True, True]
+
+    (tmp_path / 'second.sc').write_text(valid_input.format('second') +
+                                        '// comment\n')
+    results = build(paths, output_dir, 1)
+    assert [result.cached for result in results] == [True, False]
+
+    (tmp_path / 'first.c').unlink()
+    results = build(paths, output_dir, 1)
+    assert [result.cached for result in results] == [False, True]
+
+
+def test_build_write_if_changed(tmp_path):
+    paths = [write_state_chart(tmp_path / 'first.sc', 'first')]
+    output_dir = str(tmp_path)
+    build(paths, output_dir, 1, use_cache=False)
+    header = tmp_path / 'first.h'
+    os.utime(str(header), (0, 0))
+    build(paths, output_dir, 1, use_cache=False)
+    assert header.stat().st_mtime == 0
+
+
+def test_depfile_and_manifest(tmp_path):
+    paths = [
+        write_state_chart(tmp_path / 'first.sc', 'first'),
+        str(tmp_path / 'missing.sc'),
+    ]
+    output_dir = str(tmp_path)
+    results = build(paths, output_dir, 1)
+    templates = template_dependencies()
+    assert [os.path.basename(template) for template in templates] == [
+        'base.jinja', 'header_base.jinja', 'state_chart.jinja',
+        'state_chart_header.jinja', 'state_chart_impl.jinja'
+    ]
+
+    depfile = str(tmp_path / 'first.d')
+    write_depfile(depfile, paths, results)
+    with open(depfile) as depfile_:
+        assert depfile_.read() == '{} {}: {} {}\n'.format(
+            tmp_path / 'first.h', tmp_path / 'first.c', tmp_path / 'first.sc',
+            ' '.join(templates))
+
+    manifest = str(tmp_path / 'manifest.json')
+    write_manifest(manifest, paths, results)
+    with open(manifest) as manifest_:
+        state_charts = json.load(manifest_)['state_charts']
+    assert state_charts[0] == dict(
+        input=str(tmp_path / 'first.sc'),
+        outputs=[str(tmp_path / 'first.h'),
+                 str(tmp_path / 'first.c')],
+        templates=templates,
+        cached=False)
+    assert 'error' in state_charts[1]
+
+
+@pytest.mark.parametrize('options, templates', [
+    (dict(dispatch='table', storage='compact'), [
+        'base.jinja', 'header_base.jinja', 'state_chart.jinja',
+        'state_chart_header.jinja', 'state_chart_table_impl.jinja'
+    ]),
+    (dict(dispatch='flat'), [
+        'base.jinja', 'header_base.jinja', 'state_chart.jinja',
+        'state_chart_flat_header.jinja', 'state_chart_flat_impl.jinja'
+    ]),
+    (dict(language='python'), ['state_chart_module.jinja']),
+    (dict(backend='python'), []),
+])
+def test_template_dependencies(tmp_path, options, templates):
+    paths = [write_state_chart(tmp_path / 'first.sc', 'first')]
+    results = build(paths, str(tmp_path), 1, **options)
+    assert [
+        os.path.basename(template)
+        for template in template_dependencies(**options)
+    ] == templates
+
+    manifest = str(tmp_path / 'manifest.json')
+    write_manifest(manifest, paths, results, **options)
+    with open(manifest) as manifest_:
+        state_charts = json.load(manifest_)['state_charts']
+    assert state_charts[0]['templates'] == template_dependencies(**options)
@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from sclang.lib.error import Error
+from sclang.lib.parser import parse
+from sclang.lib.runtime import Program
+from sclang.lib.driver import Driver
+
+input = '''
+/some_name
+idle
+  @after(10ms) -> running
+  @start -> running
+running
+  #init
+    "run()"
+  @after(20ms) -> idle
+  @stop -> idle
+'''
+
+
+def run(main, actions={}):
+    async def main_():
+        driver = Driver(capacity=2, batch=1, budget=4)
+        task = asyncio.ensure_future(driver.run())
+        program = Program(parse(input), actions=actions, timers=driver)
+        try:
+            return await main(driver, program)
+        finally:
+            task.cancel()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(main_())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def test_mailbox():
+    async def main(driver, program):
+        instance = driver.spawn(program)
+        instance.put_nowait('start')
+        instance.put_nowait('stop')
+        with pytest.raises(asyncio.QueueFull):
+            instance.put_nowait('start')
+        # back-pressure, until the driver drains the mailbox
+        await instance.put('start')
+        assert len(instance.mailbox) < 2
+        while instance.mailbox:
+            await asyncio.sleep(0)
+        return instance.is_in('some_name/running')
+
+    assert run(main)
+
+
+def test_timers():
+    async def main(driver, program):
+        instances = [driver.spawn(program) for _ in range(3)]
+        instances[1].put_nowait('start')
+        instances[2].put_nowait('start')
+        instances[2].put_nowait('stop')
+        await asyncio.sleep(0)
+        assert [len(instance.timers) for instance in instances] == [1, 1, 1]
+        await asyncio.wait_for(
+            asyncio.gather(*[
+                instance.wait('some_name/running') for instance in instances
+            ]), 1)
+        # restarted once leaving the running state
+        await asyncio.wait_for(instances[1].wait('some_name/idle'), 1)
+        return [instance.is_in('some_name/idle') for instance in instances]
+
+    assert run(main)[1]
+
+
+def test_stale_timeout():
+    async def main(driver, program):
+        # the driver is started once the timer expired behind the events
+        # leaving and entering again its state
+        driver = Driver()
+        instance = driver.spawn(Program(program.root_state, timers=driver))
+        instance.put_nowait('start')
+        instance.put_nowait('stop')
+        await asyncio.sleep(0.02)
+        assert len(instance.mailbox) == 3
+        task = asyncio.ensure_future(driver.run())
+        while instance.mailbox:
+            await asyncio.sleep(0)
+        task.cancel()
+        return instance.is_in('some_name/idle'), len(instance.timers)
+
+    assert run(main) == (True, 1)
+
+
+def test_budget():
+    async def main(driver, program):
+        instances = [driver.spawn(program) for _ in range(8)]
+        for instance in instances:
+            instance.put_nowait('start')
+        # the driver yields to the loop after its budget of events
+        await asyncio.sleep(0)
+        return [instance.is_in('some_name/running') for instance in instances]
+
+    assert run(main) == [True] * 4 + [False] * 4
+
+
+def test_unknown_event():
+    async def main(driver, program):
+        instance = driver.spawn(program)
+        with pytest.raises(Error):
+            instance.put_nowait('jump')
+        with pytest.raises(Error):
+            await instance.put('jump')
+        return instance.mailbox
+
+    assert not run(main)
+
+
+def test_failure():
+    failing = []
+
+    def run_(machine, event):
+        if machine in failing:
+            raise ValueError
+
+    async def main(driver, program):
+        instances = [driver.spawn(program) for _ in range(3)]
+        failing.append(instances[1])
+        waiting = asyncio.ensure_future(
+            instances[1].wait('some_name/running'))
+        for instance in instances:
+            instance.put_nowait('start')
+        # the instances following the failing one keep running
+        await asyncio.wait_for(instances[2].wait('some_name/running'), 1)
+        with pytest.raises(ValueError):
+            await waiting
+        with pytest.raises(ValueError):
+            instances[1].put_nowait('stop')
+        return [instance.error for instance in instances]
+
+    errors = run(main, {'run()': run_})
+    assert errors[0] is None and errors[2] is None
+    assert isinstance(errors[1], ValueError)
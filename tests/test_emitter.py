@@ -0,0 +1,98 @@
+import os
+import glob
+import pytest
+from sclang.lib.parser import parse
+from sclang.lib.code import code, stream_if_changed
+from sclang.lib.error import Error
+
+current_dir = os.path.dirname(__file__)
+state_charts = sorted(
+    glob.glob(os.path.join(current_dir, 'code', '*.sc')) +
+    glob.glob(os.path.join(current_dir, '..', 'doc', '*.sc')))
+
+
+@pytest.mark.parametrize('path', state_charts)
+def test_same_output_as_templates(tmp_path, path):
+    with open(path) as state_chart:
+        root_state = parse(state_chart.read())
+    jinja_dir = tmp_path / 'jinja'
+    python_dir = tmp_path / 'python'
+    jinja_dir.mkdir()
+    python_dir.mkdir()
+    jinja_outputs = code(root_state, str(jinja_dir), backend='jinja')
+    python_outputs = code(root_state, str(python_dir), backend='python')
+    assert len(jinja_outputs) == len(python_outputs) == 2
+    for jinja_output, python_output in zip(jinja_outputs, python_outputs):
+        with open(jinja_output, 'rb') as jinja_file, \
+                open(python_output, 'rb') as python_file:
+            assert jinja_file.read() == python_file.read()
+    assert sorted(os.listdir(str(python_dir))) == sorted(
+        os.listdir(str(jinja_dir)))
+
+
+@pytest.mark.parametrize('backend', ['jinja', 'python'])
+def test_unhandled_events_pruned(tmp_path, backend):
+    input = '''
+/some_name
+@RESET -> some_name
+off
+  @BUTTON_PRESS -> on
+  idle
+    @TIMEOUT -> busy
+  busy
+on
+  @BUTTON_PRESS -> off
+'''
+    _, impl = code(parse(input), str(tmp_path), backend=backend)
+    with open(impl) as impl_file:
+        content = impl_file.read()
+    off_handler = content.split(
+        'static void some_name_off_handle_event(some_name_sc_t* sc, '
+        'some_name_event_t evt)\n{\n')[-1]
+    # off and its substates only handle BUTTON_PRESS and TIMEOUT
+    assert off_handler.startswith('''    // the other events aren't handled by this state nor its substates
+    switch (evt)
+    {
+    case SOME_NAME_EVT_BUTTON_PRESS:
+    case SOME_NAME_EVT_TIMEOUT:
+        break;
+    default:
+        return;
+    }
+''')
+    # all the events are handled from the root state
+    assert content.count('default:\n        return;') == 1
+
+
+@pytest.mark.parametrize('backend', ['jinja', 'python'])
+def test_regions_broadcast(tmp_path, backend):
+    with open(os.path.join(current_dir, 'code', 'parallel.sc')) as input_:
+        root_state = parse(input_.read())
+    header, impl = code(root_state, str(tmp_path), backend=backend)
+    with open(header) as header_file:
+        # a field per region, none for the parallel state
+        assert 'parallel_on_state' not in header_file.read()
+    with open(impl) as impl_file:
+        # the regions return the depth left active by their transitions
+        assert '''    kept = parallel_on_caps_handle_event(sc, evt);
+    if (kept < 2)
+    {
+        return;
+    }
+    kept = parallel_on_num_handle_event(sc, evt);
+''' in impl_file.read()
+    for dispatch in ['table', 'flat']:
+        with pytest.raises(Error):
+            code(root_state, str(tmp_path), dispatch=dispatch)
+
+
+def test_stream_if_changed_failure(tmp_path):
+    path = str(tmp_path / 'output.c')
+
+    def emit(writer):
+        writer.line('partial')
+        raise Error('emitter failure')
+
+    with pytest.raises(Error):
+        stream_if_changed(path, emit)
+    assert os.listdir(str(tmp_path)) == []
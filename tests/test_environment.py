@@ -0,0 +1,44 @@
+from jinja2 import FileSystemLoader, ModuleLoader
+from sclang.lib.parser import parse
+from sclang.lib.code import style
+from sclang.lib.storage import StateStorage
+from sclang.lib.timers import Timers
+from sclang.lib.regions import Regions
+from sclang.lib.environment import (template_dir, create_environment,
+                                    compile_templates,
+                                    compiled_templates_are_valid,
+                                    get_environment)
+
+input = '''
+/some_name
+off
+  @BUTTON_PRESS -> on
+  @TIMEOUT
+    ["count == 3"] -> off
+on
+  @TIMEOUT -> off
+'''
+
+
+def test_shared_environment():
+    assert get_environment() is get_environment()
+
+
+def test_compile_templates(tmp_path):
+    assert not compiled_templates_are_valid(str(tmp_path))
+    compile_templates(str(tmp_path))
+    assert compiled_templates_are_valid(str(tmp_path))
+
+    root_state = parse(input)
+    compiled = create_environment(ModuleLoader(str(tmp_path)))
+    source = create_environment(FileSystemLoader(template_dir))
+    storage = StateStorage('enum', [2])
+    timers = Timers(root_state, style)
+    regions = Regions(root_state)
+    for name in ['state_chart_header.jinja', 'state_chart_impl.jinja']:
+        assert compiled.get_template(name).render(
+            root_state=root_state, storage=storage, queue=None,
+            timers=timers, regions=regions,
+            **style) == source.get_template(name).render(
+                root_state=root_state, storage=storage, queue=None,
+                timers=timers, regions=regions, **style)
@@ -0,0 +1,63 @@
+import os
+import pytest
+from sclang.lib.parser import parse
+from sclang.lib.code import code
+from sclang.lib.event_queue import EventQueue
+from sclang.lib.storage import StateStorage
+
+current_dir = os.path.dirname(__file__)
+
+
+def read_queue_header(tmp_path, backend='jinja', **options):
+    with open(os.path.join(current_dir, 'code', 'queue.sc')) as input_:
+        sc = parse(input_.read())
+    header, _ = code(sc, str(tmp_path), backend=backend, **options)
+    with open(header) as header_file:
+        return header_file.read()
+
+
+def test_queue_fields():
+    queue = EventQueue(300, 3, 'compact')
+    assert queue.index_type == 'uint16_t'
+    assert queue.event_field('a_event_t', 'queue', 'N') == 'uint8_t queue[N]'
+    queue = EventQueue(255, 3, 'enum')
+    assert queue.index_type == 'uint8_t'
+    assert queue.event_field('a_event_t', 'queue', 'N') == 'a_event_t queue[N]'
+    # the head and count fields are aligned after the events
+    queue = EventQueue(300, 3, 'compact')
+    assert StateStorage('compact', [2], queue).size == 306
+    # the spsc indices go up to twice the capacity
+    queue = EventQueue(129, 3, 'compact', 'spsc')
+    assert queue.index_type == 'uint16_t'
+    assert queue.index_names == ['head', 'tail']
+    assert queue.index_field('queue_tail') == '_Atomic uint16_t queue_tail'
+
+
+@pytest.mark.parametrize('backend', ['jinja', 'python'])
+def test_queue_capacity(tmp_path, backend):
+    content = read_queue_header(tmp_path, backend)
+    assert '#define QUEUE_QUEUE_CAPACITY 3\n' in content
+    assert '    queue_event_t queue[QUEUE_QUEUE_CAPACITY];\n' in content
+    assert 'bool queue_post(queue_sc_t* sc, queue_event_t evt);\n' in content
+    # the command line overrides the statechart capacity
+    content = read_queue_header(tmp_path, backend, queue_capacity=8)
+    assert '#define QUEUE_QUEUE_CAPACITY 8\n' in content
+    content = read_queue_header(tmp_path, backend, queue_capacity=0)
+    assert 'queue_post' not in content
+    assert 'queue_head' not in content
+
+
+@pytest.mark.parametrize('backend', ['jinja', 'python'])
+def test_spsc_queue(tmp_path, backend):
+    content = read_queue_header(tmp_path, backend, queue_kind='spsc')
+    assert '#include <stdatomic.h>\n' in content
+    assert '    _Atomic uint8_t queue_tail;\n' in content
+    content = read_queue_header(tmp_path, backend)
+    assert 'stdatomic' not in content
+
+
+def test_queue_size_check(tmp_path):
+    content = read_queue_header(tmp_path, dispatch='flat', storage='bitfield')
+    assert '    uint8_t queue[QUEUE_QUEUE_CAPACITY];\n' in content
+    assert ('typedef char queue_sc_size_check_t'
+            '[sizeof(queue_sc_t) <= 6 ? 1 : -1];') in content
@@ -0,0 +1,90 @@
+import os
+from sclang.lib.parser import parse
+from sclang.lib.code import code
+from sclang.lib.flat import FlatStateChart
+
+current_dir = os.path.dirname(__file__)
+
+
+def test_states():
+    input = '''
+/some_name
+off
+  @BUTTON_PRESS -> on
+  idle
+    @CHECK -> check
+  <>check
+    ["x == 1"] -> ../on
+    [else] -> idle
+on
+'''
+    sc = parse(input)
+    flat = FlatStateChart(sc)
+    off, on = sc.states
+    idle, check = off.states
+    # transient states have no enum value
+    assert flat.states == [off, idle, on]
+    assert flat.leaves == [idle, on]
+    assert flat.transients == [check]
+    assert list(flat.last_states.items()) == [(off, idle), (idle, idle),
+                                              (on, on)]
+    assert flat.descent(sc) == [sc, off, idle]
+    assert flat.exit_states(idle, sc) == [idle, off, sc]
+
+
+def test_handler_steps():
+    input = '''
+/some_name
+@RESET -> some_name/on
+off
+  #exit
+    "x = 0"
+  @TIMEOUT
+    ["x == 1"] -> on
+    [else] --
+      "x = 1"
+  idle
+    #exit
+      "y = 0"
+    @TIMEOUT
+      ["y == 1"] -> ../on
+      ["y == 2"] -> busy
+  busy
+    @TIMEOUT -> idle
+on
+'''
+    sc = parse(input)
+    flat = FlatStateChart(sc)
+    off, on = sc.states
+    idle, busy = off.states
+
+    steps = dict(flat.event_handlers[idle])['TIMEOUT']
+    assert [step.state for step in steps] == [idle, off]
+    # idle may have been left for on or busy, so off checks it is
+    # still active and doesn't know which of its leaves is the active one
+    assert [(step.check, step.leaf) for step in steps] == [(False, idle),
+                                                           (True, None)]
+    assert flat.exits == [off]
+    assert flat.exit_groups(off) == [([idle], ['y = 0', 'x = 0']),
+                                     ([busy], ['x = 0'])]
+
+    steps = dict(flat.event_handlers[busy])['TIMEOUT']
+    # busy always goes to idle, which off handles the event from
+    assert [(step.state, step.check, step.leaf)
+            for step in steps] == [(busy, False, busy), (off, False, idle)]
+    steps = dict(flat.event_handlers[on])['RESET']
+    assert [(step.state, step.check, step.leaf)
+            for step in steps] == [(sc, False, on)]
+
+
+def test_flat_dispatch(tmp_path):
+    with open(os.path.join(current_dir, 'code', 'composite.sc')) as input_:
+        sc = parse(input_.read())
+    header, impl = code(sc, str(tmp_path), dispatch='flat')
+    with open(header) as header_file:
+        content = header_file.read()
+    assert 'composite_state_t state;' in content
+    assert 'level_zero_state' not in content
+    assert 'bool composite_is_in(' in content
+    with open(impl) as impl_file:
+        assert 'composite_last_states[]' in impl_file.read()
@@ -0,0 +1,131 @@
+import os
+import sys
+import subprocess
+import importlib.util
+import pytest
+from sclang.lib.parser import parse
+from sclang.lib.error import Error
+from sclang.lib.code import code
+from sclang.lib.runtime import Program, Machine
+
+current_dir = os.path.dirname(__file__)
+
+input = '''
+/some_name
+left
+  @go
+    ["ready"] -> right
+      "go()"
+right
+  @go -> choice
+<>choice
+  ["ready"] -> left
+  [else] -> choice
+'''
+
+
+def read_state_chart(name):
+    with open(os.path.join(current_dir, 'code', name + '.sc')) as input_:
+        return parse(input_.read())
+
+
+def load(path):
+    spec = importlib.util.spec_from_file_location(
+        os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def trace_actions(sc, trace):
+    return {
+        action: lambda state_chart, event, action=action: trace.append(action)
+        for state in sc.all_states
+        for action in state.init_actions + state.exit_actions + [
+            action for transition in state.transitions
+            for action in transition.actions
+        ]
+    }
+
+
+@pytest.mark.parametrize('name', ['composite', 'parallel'])
+def test_runtime_ordering(tmp_path, name):
+    sc = read_state_chart(name)
+    output, = code(sc, str(tmp_path), language='python')
+    assert output == os.path.join(str(tmp_path), name + '.py')
+    module = load(output)
+    trace = []
+    machine = Machine(Program(sc, actions=trace_actions(sc, trace)))
+    module_trace = []
+    state_chart = getattr(module, name.capitalize())(
+        actions=trace_actions(sc, module_trace))
+    states = [
+        state for state in sc.all_states
+        if not state.is_root and not state.is_transient
+    ]
+    for i in range(200):
+        event = (7 * i) % len(module.EVENTS)
+        machine.send(module.EVENTS[event])
+        state_chart.handle_event(event)
+        assert module_trace == trace
+        assert [state_chart.is_in(j) for j in range(len(states))
+                ] == [machine.is_in(state.path) for state in states]
+
+
+def test_module(tmp_path):
+    output, = code(read_state_chart('timed'), str(tmp_path), language='python')
+    module = load(output)
+    assert module.ST_RUNNING_FAST == 3
+    assert module.TIMERS == ((module.EVT_IDLE_TIMEOUT, 100),
+                             (module.EVT_RUNNING_TIMEOUT, 5000),
+                             (module.EVT_RUNNING_SLOW_TIMEOUT, 2000))
+    calls = []
+
+    class Timers:
+        def start_timer(self, state_chart, event, delay):
+            calls.append((event, delay))
+
+        def cancel_timer(self, state_chart, event):
+            calls.append(event)
+
+    timed = module.Timed(timers=Timers())
+    timed.handle_event(module.EVT_START)
+    assert timed.is_in(module.ST_RUNNING_SLOW)
+    assert calls == [(module.EVT_IDLE_TIMEOUT, 100), module.EVT_IDLE_TIMEOUT,
+                     (module.EVT_RUNNING_TIMEOUT, 5000),
+                     (module.EVT_RUNNING_SLOW_TIMEOUT, 2000)]
+    # neither lark nor jinja2 are needed to run the module
+    code_ = ('import sys\nsys.path.insert(0, {!r})\nimport timed\n'
+             'assert "lark" not in sys.modules\n'
+             'assert "jinja2" not in sys.modules\n').format(str(tmp_path))
+    subprocess.run([sys.executable, '-c', code_], check=True)
+
+
+def test_guards(tmp_path):
+    sc = parse(input.replace('[else] -> choice', '[else] -> right'))
+    module = load(code(sc, str(tmp_path), language='python')[0])
+    ready = [False]
+    trace = []
+    state_chart = module.SomeName({'ready': lambda *args: ready[0]},
+                                  {'go()': lambda *args: trace.append('go')})
+    state_chart.handle_event(module.EVT_GO)
+    assert state_chart.is_in(module.ST_LEFT)
+    ready[0] = True
+    state_chart.handle_event(module.EVT_GO)
+    assert state_chart.is_in(module.ST_RIGHT)
+    assert trace == ['go']
+    state_chart.handle_event(module.EVT_GO)
+    assert state_chart.is_in(module.ST_LEFT)
+    with pytest.raises(KeyError):
+        module.SomeName()
+
+
+def test_errors(tmp_path):
+    with pytest.raises(Error, match='transient state "some_name/choice" '
+                       'leads back to itself'):
+        code(parse(input), str(tmp_path), language='python')
+    with pytest.raises(Error, match='the python modules follow the switch'):
+        code(read_state_chart('composite'),
+             str(tmp_path),
+             dispatch='table',
+             language='python')
@@ -1,4 +1,5 @@
-from sclang.lib.parser import parse, ParsingError, DefinitionError
+from sclang.lib.parser import (parse, validate, get_parser, Parser,
+                               ParsingError, DefinitionError)
 import pytest
 
 
@@ -99,6 +100,9 @@ on
     with pytest.raises(DefinitionError) as exc:
         parse(input)
     assert 'invalid transition target "offf" in state "on"' in str(exc.value)
+    # left unresolved without validation
+    sc = parse(input, check=False)
+    assert sc.states[1].event_handlers[0].transitions[0].target == 'offf'
 
 
 def test_unreachable_state():
@@ -513,6 +517,25 @@ on
         2].target.path == 'some_name/off/not_really_off/what'
 
 
+
+def test_target_path_through_root():
+    input = '''
+/some_name
+@RESET -> some_name/off
+off
+  not_really_off
+    @SOME_EVENT -> ../../some_name/on
+    @OTHER_EVENT -> ../../some_name
+on
+  @TIMEOUT -> ../some_name/off/not_really_off
+'''
+    sc = parse(input)
+    off, on = sc.states
+    assert sc.transitions[0].target is off
+    assert off.states[0].transitions[0].target is on
+    assert off.states[0].transitions[1].target is sc
+    assert on.transitions[0].target is off.states[0]
+
 composite_invalid_transition_target_params = [('''
 /some_name
 off
@@ -710,3 +733,165 @@ on
 // comment 7
 '''
     parse(input)
+
+
+@pytest.mark.parametrize('tree_less', [True, False])
+def test_parser_reuse(tree_less):
+    input = '''
+/simplest
+off
+  @BUTTON_PRESS -> on
+on
+  @TIMEOUT -> off
+'''
+    parser = Parser(cache=False, tree_less=tree_less)
+    first = parser.parse(input)
+    second = parser.parse(input)
+    assert first is not second
+    assert [state.name for state in first.all_states] == [
+        state.name for state in second.all_states
+    ]
+    with pytest.raises(ParsingError):
+        parser.parse('%khcvbk')
+    assert parser.parse(input).states[1].name == 'on'
+
+
+def test_shared_parser():
+    assert get_parser() is get_parser()
+
+
+def test_tree_less_parsing():
+    input = '''
+/some_name
+#init
+  "bonjour()"
+off
+  @TIMEOUT
+    ["count == 3"] -> on
+    [else] --
+      "set(7)"
+  <>half_off
+    ["count == 6"] -> ../on
+    [else] -> yes
+  yes
+    #exit
+      "stop()"
+on
+  @TIMEOUT -> off/yes
+'''
+
+    def dump(root_state):
+        return [(state.path, state.init_actions, state.exit_actions,
+                 [(transition.event_handler.event, transition.guard
+                   if not transition.is_else_guard else 'else',
+                   transition.target.path if transition.target else None,
+                   transition.actions) for transition in state.transitions])
+                for state in root_state.all_states]
+
+    tree = Parser(tree_less=False).parse(input)
+    tree_less = Parser(tree_less=True).parse(input)
+    assert dump(tree) == dump(tree_less)
+
+
+def test_validate_not_indexed():
+    input = '''
+/some_name
+off
+  @BUTTON_PRESS -> on
+on
+  @TIMEOUT -> off
+'''
+    sc = parse(input, check=False)
+    for state in sc.all_states:
+        state.table = None
+    validate(sc)
+    assert sc.table is not None
+    assert sc.states[0].transitions[0].target is sc.states[1]
+
+
+@pytest.mark.parametrize('tree_less', [False, True])
+def test_queue_capacity(tree_less):
+    input = '''
+/some_name
+#queue 16
+#init
+  "bonjour()"
+off
+  @TIMEOUT -> off
+'''
+    sc = Parser(tree_less=tree_less).parse(input)
+    assert sc.queue_capacity == 16
+    assert sc.init_actions == ['bonjour()']
+    assert sc.queue_kind is None
+    assert parse(input.replace('#queue 16\n', '')).queue_capacity is None
+    sc = parse(input.replace('16', '16 spsc'))
+    assert (sc.queue_capacity, sc.queue_kind) == (16, 'spsc')
+    with pytest.raises(DefinitionError):
+        parse(input.replace('16', '0'))
+
+
+@pytest.mark.parametrize('tree_less', [False, True])
+def test_timeout(tree_less):
+    input = '''
+/some_name
+off
+  @after(100ms) -> on
+  @START -> on
+on
+  @after(2s) -> off
+  sub_state
+    @after(10ms) -> ../off
+'''
+    sc = Parser(tree_less=tree_less).parse(input)
+    off, on = sc.states
+    assert off.event_handlers[0].timeout == 100
+    assert off.event_handlers[0].event == 'off_timeout'
+    assert off.event_handlers[1].timeout is None
+    assert on.event_handlers[0].timeout == 2000
+    assert on.states[0].event_handlers[0].event == 'on_sub_state_timeout'
+    assert list(sc.event_names) == [
+        'off_timeout', 'START', 'on_timeout', 'on_sub_state_timeout'
+    ]
+    with pytest.raises(DefinitionError):
+        parse(input.replace('@START', '@OFF_TIMEOUT'))
+    with pytest.raises(DefinitionError):
+        parse(input.replace('@START', '@after(1s)'))
+
+
+def test_deep_state_chart():
+    # deeper than the recursion limit
+    depth = 1500
+    lines = ['/deep'] + ['  ' * level + 'level' for level in range(depth)]
+    lines.append('  ' * depth + '@after(10ms) -> level')
+    sc = parse('\n'.join(lines))
+    deepest = sc.all_states[-1]
+    assert len(deepest.path_elements) == depth + 1
+    assert deepest.event_handlers[0].event == '_'.join(['level'] * depth +
+                                                       ['timeout'])
+
+
+@pytest.mark.parametrize('tree_less', [False, True])
+def test_regions(tree_less):
+    input = '''
+/some_name
+off
+  @POWER -> on
+on
+  || caps
+    caps_off
+      @CAPS -> caps_on
+    caps_on
+  || num
+    num_off
+      @NUM -> num_on
+    num_on
+'''
+    sc = Parser(tree_less=tree_less).parse(input)
+    off, on = sc.states
+    caps, num = on.states
+    assert on.is_parallel and not on.has_field
+    assert caps.is_region and caps.is_initial and num.is_initial
+    assert not off.is_parallel and not caps.is_parallel
+    assert num.exclusive_state is on
+    with pytest.raises(DefinitionError):
+        parse(input.replace('|| num', 'num'))
@@ -0,0 +1,174 @@
+import os
+import pytest
+from sclang.lib.parser import parse
+from sclang.lib.error import Error
+from sclang.lib.runtime import Program, Machine
+
+current_dir = os.path.dirname(__file__)
+
+input = '''
+/some_name
+#init
+  "init(root)"
+left
+  #init
+    "init(left)"
+  #exit
+    "exit(left)"
+  @go
+    ["ready"] -> right
+      "go()"
+    [else] --
+      "wait()"
+  left_sub
+    #exit
+      "exit(left_sub)"
+    @go
+      ["early"] -> ../choice
+right
+  #init
+    "init(right)"
+  @back -> left
+<>choice
+  ["ready"] -> right
+  [else] -> left
+'''
+
+
+def read_state_chart(name):
+    with open(os.path.join(current_dir, 'code', name + '.sc')) as input_:
+        return parse(input_.read())
+
+
+def trace_program(sc, guards={}):
+    trace = []
+    actions = {}
+    for state in sc.all_states:
+        for action in state.init_actions + state.exit_actions + [
+                action for transition in state.transitions
+                for action in transition.actions
+        ]:
+            actions[action] = lambda machine, event, action=action: \
+                trace.append(action)
+    return Program(sc, guards, actions), trace
+
+
+def test_ordering():
+    values = {'ready': False, 'early': False}
+    guards = {
+        guard: lambda machine, event, guard=guard: values[guard]
+        for guard in values
+    }
+    program, trace = trace_program(parse(input), guards)
+    machine = Machine(program)
+    assert trace == ['init(root)', 'init(left)']
+    assert machine.is_in('some_name/left/left_sub')
+    machine.send('go')
+    assert trace[2:] == ['wait()']
+    values['ready'] = True
+    machine.send('go')
+    assert trace[3:] == [
+        'exit(left_sub)', 'exit(left)', 'go()', 'init(right)'
+    ]
+    assert machine.is_in('some_name/right')
+    assert not machine.is_in('some_name/left')
+    del trace[:]
+    machine.send('back')
+    values['early'] = True
+    machine.send('go')
+    # the transient state leads to right, left no longer handling the event
+    assert trace == [
+        'init(left)', 'exit(left_sub)', 'exit(left)', 'init(right)'
+    ]
+    assert machine.is_in('some_name/right')
+
+
+def test_composite():
+    program, trace = trace_program(read_state_chart('composite'))
+    machine = Machine(program)
+    assert machine.is_in('composite/LevelZero/LevelOne/LevelTwo')
+    del trace[:]
+    machine.send('event_two')
+    assert trace == ['exit_ |= 0x4', 'exit_ |= 0x2']
+    assert machine.is_in('composite/LevelZero/LevelOneTwo/LevelOneTwoOne')
+    machine.send('event_four')
+    assert trace[2:] == ['exit_ |= 0x8', 'init_ |= 0x2', 'init_ |= 0x4']
+    machine.send('reset')
+    assert machine.configuration == 0
+
+
+def test_parallel():
+    program, trace = trace_program(read_state_chart('parallel'))
+    machine = Machine(program)
+    machine.send('power')
+    assert machine.is_in('parallel/On/Caps/CapsOff')
+    assert machine.is_in('parallel/On/Num/NumOff')
+    assert trace[2:] == ['init_ |= 0x1', 'init_ |= 0x8']
+    del trace[:]
+    machine.send_all(['num_lock', 'caps_lock'])
+    # the num region leaves the parallel state after the caps region
+    # handled the event
+    assert trace == [
+        'init_ |= 0x4', 'exit_ |= 0x10', 'exit_ |= 0x2', 'exit_ |= 0x1',
+        'init_ |= 0x1', 'init_ |= 0x8', 'init_ |= 0x4'
+    ]
+    assert machine.is_in('parallel/On/Caps/CapsOn')
+    assert machine.is_in('parallel/On/Num/NumOff')
+    del trace[:]
+    # the num region doesn't handle the event once the state is left
+    machine.send('num_lock')
+    assert machine.is_in('parallel/Off')
+    assert trace == ['exit_ |= 0x2', 'exit_ |= 0x1']
+    # nor once the state is left and entered again
+    machine.send_all(['power', 'cross'])
+    assert machine.is_in('parallel/On/Caps/CapsOff')
+    assert machine.is_in('parallel/On/Num/NumOn')
+
+
+def test_root_regions():
+    machine = Machine(Program(read_state_chart('root_regions')))
+    # the right region doesn't handle the event once the left one is left
+    machine.send('cross')
+    assert machine.is_in('root_regions/Right/RightOn')
+
+
+def test_shared_program():
+    program = Program(read_state_chart('parallel'))
+    machines = [Machine(program) for _ in range(2)]
+    machines[0].send('power')
+    assert machines[0].is_in('parallel/On')
+    assert machines[1].is_in('parallel/Off')
+    machines[1].send('power')
+    assert machines[0].configuration == machines[1].configuration
+
+
+def test_errors():
+    with pytest.raises(Error, match='guard "ready" is not bound'):
+        Program(parse(input))
+    machine = Machine(Program(read_state_chart('parallel')))
+    with pytest.raises(Error, match='unknown event "unknown"'):
+        machine.send('unknown')
+
+
+def test_timers():
+    trace = []
+
+    class Timers:
+        def start_timer(self, machine, event, delay):
+            trace.append(('start', event, delay))
+
+        def cancel_timer(self, machine, event):
+            trace.append(('cancel', event))
+
+    machine = Machine(
+        Program(read_state_chart('timed'),
+                actions={'entered(sc, SLOW)': lambda machine, event: trace.
+                         append('slow')},
+                timers=Timers()))
+    del trace[:]
+    machine.send('START')
+    # as the generated code, the timers are started and cancelled
+    # before the actions of their state
+    assert trace == [('cancel', 'idle_timeout'),
+                     ('start', 'running_timeout', 5000),
+                     ('start', 'running_slow_timeout', 2000), 'slow']
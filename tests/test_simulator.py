@@ -0,0 +1,136 @@
+import os
+import pytest
+from sclang.lib.parser import parse
+from sclang.lib.error import Error
+from sclang.lib.runtime import Program, Machine
+
+np = pytest.importorskip('numpy')
+from sclang.lib.simulator import Simulator, FALLBACK, ACTIONS
+
+current_dir = os.path.dirname(__file__)
+
+input = '''
+/some_name
+idle
+  @start
+    ["ready"] -> running
+      "started()"
+running
+  @stop -> idle
+'''
+
+
+def read_state_chart(name):
+    with open(os.path.join(current_dir, 'code', name + '.sc')) as input_:
+        return parse(input_.read())
+
+
+def test_unguarded():
+    sc = read_state_chart('parallel')
+    simulator = Simulator(Program(sc), 4)
+    power, num_lock = simulator.event_ids(['power', 'num_lock'])
+    simulator.step([power, power, -1, power])
+    assert simulator.is_in('parallel/On').tolist() == [
+        True, True, False, True
+    ]
+    simulator.step([num_lock, -1, num_lock, power])
+    assert simulator.is_in('parallel/On/Num/NumOn').tolist() == [
+        True, False, False, False
+    ]
+    assert simulator.is_in('parallel/Off').tolist() == [
+        False, False, True, True
+    ]
+    assert FALLBACK not in simulator.transitions
+    machine = Machine(simulator.program)
+    machine.send_all(['power', 'num_lock'])
+    assert simulator.configurations[0] == machine.configuration
+
+
+def test_guarded():
+    ready = np.array([False, True, True])
+    started = []
+    program = Program(
+        parse(input), {'ready': lambda indices, event: ready[indices]},
+        {'started()': lambda indices, event: started.extend(indices.tolist())})
+    simulator = Simulator(program, 3)
+    start, stop = simulator.event_ids(['start', 'stop'])
+    simulator.step([start, start, -1])
+    assert simulator.is_in('some_name/running').tolist() == [
+        False, True, False
+    ]
+    assert started == [1]
+    simulator.step([start, stop, start])
+    assert simulator.is_in('some_name/running').tolist() == [
+        False, False, True
+    ]
+    assert started == [1, 2]
+    assert simulator.transitions[program.initial[1], start] == FALLBACK
+
+
+def test_actions():
+    input = '''
+/some_name
+idle
+  @start -> running
+    "started()"
+running
+  #init
+    "entered()"
+  @stop -> idle
+'''
+    calls = []
+    program = Program(
+        parse(input), {}, {
+            'started()':
+            lambda indices, event: calls.append(('started', indices.tolist())),
+            'entered()':
+            lambda indices, event: calls.append(('entered', indices.tolist()))
+        })
+    simulator = Simulator(program, 5)
+    start, stop = simulator.event_ids(['start', 'stop'])
+    simulator.step([start, -1, start, stop, start])
+    # each action is called once for all the instances taking its step
+    assert calls == [('started', [0, 2, 4]), ('entered', [0, 2, 4])]
+    simulator.step([stop, start, start, start, -1])
+    assert calls[2:] == [('started', [1, 3]), ('entered', [1, 3])]
+    assert simulator.is_in('some_name/running').tolist() == [
+        False, True, True, True, True
+    ]
+    assert simulator.transitions[program.initial[1], start] == ACTIONS
+
+
+def test_guarded_and_unguarded_actions():
+    input = '''
+/some_name
+idle
+  @start
+    ["ready"] -> running
+      "count()"
+  @go -> running
+    "count()"
+running
+  @stop -> idle
+'''
+    counts = np.zeros(4, int)
+    types = set()
+
+    def count(indices, event):
+        # the same action on the steps with and without guards
+        types.add(type(indices))
+        counts[indices] += 1
+
+    program = Program(parse(input), {'ready': lambda indices, event: True},
+                      {'count()': count})
+    simulator = Simulator(program, 4)
+    start, go, stop = simulator.event_ids(['start', 'go', 'stop'])
+    simulator.step([start, go, go, -1])
+    simulator.step([stop, stop, -1, -1])
+    simulator.step([go, start, -1, go])
+    assert counts.tolist() == [2, 2, 1, 1]
+    assert types == {np.ndarray}
+
+
+def test_unknown_event():
+    simulator = Simulator(Program(read_state_chart('parallel')), 1)
+    with pytest.raises(Error, match='unknown event "unknown"'):
+        simulator.event_ids(['power', 'unknown'])
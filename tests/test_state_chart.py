@@ -176,3 +176,144 @@ on
     assert sc.states[0].states[0].states_to_ancestor(sc.states[0]) == []
     assert sc.states[0].states[0].states_to_ancestor(
         sc.states[0].states[0]) == []
+
+
+def test_state_table():
+    input = '''
+/some_name
+off
+  @BUTTON_PRESS -> on
+  @TIMEOUT -> off
+  not_really_off
+    @SOME_EVENT -> really_off
+    what
+  really_off
+    @OTHER_EVENT -> not_really_off
+on
+  @TIMEOUT -> off
+'''
+    sc = parse(input)
+    table = sc.table
+    assert [state.id for state in sc.all_states] == list(range(6))
+    assert all(state.table is table for state in sc.all_states)
+    assert list(table.parents) == [-1, 0, 1, 2, 1, 0]
+    assert list(table.depths) == [0, 1, 2, 3, 2, 1]
+    assert list(table.first_children) == [1, 2, 3, -1, -1, -1]
+    assert list(table.ends) == [6, 5, 4, 4, 5, 6]
+    assert not hasattr(sc, '__dict__')
+
+
+def test_all_states_view():
+    input = '''
+/some_name
+off
+  @BUTTON_PRESS -> on
+  not_really_off
+    @SOME_EVENT -> really_off
+    what
+  really_off
+    @OTHER_EVENT -> not_really_off
+on
+  @TIMEOUT -> off
+'''
+    sc = parse(input)
+    off = sc.states[0]
+    assert len(off.all_states) == 4
+    assert off.all_states[0] is off
+    assert off.all_states[-1] is off.states[1]
+    assert off.all_states[1:3] == [off.states[0], off.states[0].states[0]]
+    assert list(off.all_states) == list(sc.all_states)[1:5]
+    assert list(off.event_names) == [
+        'BUTTON_PRESS', 'SOME_EVENT', 'OTHER_EVENT'
+    ]
+    assert list(sc.states[1].all_states) == [sc.states[1]]
+    assert list(sc.states[0].states[0].states[0].event_names) == []
+
+
+def test_common_ancestor_index():
+    input = '''
+/some_name
+off
+  not_really_off
+    what
+      @EVENT -> ../../on/deep
+      @OTHER_EVENT -> really_off
+    really_off
+  other_off
+on
+  deep
+    @EVENT -> ../off/other_off
+'''
+    sc = parse(input)
+    table = sc.table
+    for state in sc.all_states:
+        for other in sc.all_states:
+            ancestor = state
+            while ancestor is not other and not (
+                    ancestor.id < other.id < table.ends[ancestor.id]):
+                ancestor = ancestor.parent
+            assert state.common_ancestor(other) is ancestor
+            assert other.common_ancestor(state) is ancestor
+
+
+def test_transition_states():
+    input = '''
+/some_name
+off
+  not_really_off
+    what
+      @EVENT -> ../../on/deep
+      @OTHER_EVENT -> really_off
+    really_off
+  other_off
+on
+  deep
+    @EVENT -> ../off/other_off
+'''
+    sc = parse(input)
+    off, on = sc.states
+    what = off.states[0].states[0]
+    deep = on.states[0]
+    transition = what.transitions[0]
+    assert transition.exit_states == [what, off.states[0], off]
+    assert transition.entry_states == [on, deep]
+    transition = deep.transitions[0]
+    assert transition.exit_states == [deep, on]
+    assert transition.entry_states == [off, off.states[1]]
+
+
+def test_region_transition_steps():
+    input = '''
+/some_name
+off
+  @EVENT -> on/num/num_on
+on
+  || caps
+    caps_off
+      @EVENT -> ../num/num_on
+    caps_on
+  || num
+    num_off
+      @OTHER -> ../caps/caps_on
+    num_on
+      @EVENT -> ../../off
+'''
+    sc = parse(input)
+    off, on = sc.states
+    caps, num = on.states
+    caps_off = caps.states[0]
+    num_on = num.states[1]
+    # the other regions are entered along
+    transition = off.transitions[0]
+    assert transition.entry_steps == [(on, False), (caps, True),
+                                      (num, False), (num_on, True)]
+    # a transition between regions leaves the parallel state
+    transition = caps_off.transitions[0]
+    assert transition.exit_states == [caps_off, caps, on]
+    assert transition.exit_steps == [(caps_off, True), (caps, False),
+                                     (num, True), (on, False)]
+    assert transition.entry_states == [on, num, num_on]
+    transition = num_on.transitions[0]
+    assert transition.exit_steps == [(num_on, True), (num, False),
+                                     (caps, True), (on, False)]
+    assert transition.entry_steps == [(off, True)]
@@ -0,0 +1,48 @@
+import os
+import pytest
+from sclang.lib.parser import parse
+from sclang.lib.code import code
+from sclang.lib.storage import StateStorage
+from sclang.lib.error import Error
+
+current_dir = os.path.dirname(__file__)
+
+
+def test_compact_fields():
+    storage = StateStorage('compact', [2, 300, 3])
+    assert storage.field('a_state_t', 'state', 2) == 'uint8_t state'
+    assert storage.field('b_state_t', 'b_state', 300) == 'uint16_t b_state'
+    # the uint16_t field is aligned, and so is the structure size
+    assert storage.size == 6
+
+
+def test_bitfield_fields():
+    storage = StateStorage('bitfield', [2, 5, 1])
+    assert storage.bitfield_type == 'uint8_t'
+    assert storage.field('a_state_t', 'state', 2) == 'uint8_t state : 1'
+    assert storage.field('b_state_t', 'b_state', 5) == 'uint8_t b_state : 3'
+    assert storage.size == 1
+    # fields don't straddle the bitfield units
+    storage = StateStorage('bitfield', [2**15] * 3)
+    assert storage.bitfield_type == 'uint32_t'
+    assert storage.size == 8
+
+
+def test_enum_fields():
+    storage = StateStorage('enum', [2])
+    assert storage.field('a_state_t', 'state', 2) == 'a_state_t state'
+    assert storage.size is None
+
+
+@pytest.mark.parametrize('backend', ['jinja', 'python'])
+def test_size_check(tmp_path, backend):
+    with open(os.path.join(current_dir, 'code', 'composite.sc')) as input_:
+        sc = parse(input_.read())
+    header, _ = code(sc, str(tmp_path), backend=backend, storage='compact')
+    with open(header) as header_file:
+        content = header_file.read()
+    assert '    uint8_t level_zero_state;\n' in content
+    assert ('typedef char composite_sc_size_check_t'
+            '[sizeof(composite_sc_t) <= 4 ? 1 : -1];') in content
+    with pytest.raises(Error):
+        code(sc, str(tmp_path), dispatch='table', storage='bitfield')
@@ -0,0 +1,85 @@
+import os
+import pytest
+from sclang.lib.parser import parse
+from sclang.lib.code import code
+from sclang.lib.tables import StateChartTables, index_type
+from sclang.lib.error import Error
+
+current_dir = os.path.dirname(__file__)
+
+
+def test_state_rows():
+    input = '''
+/some_name
+#init
+  "x = 0"
+off
+  @BUTTON_PRESS -> on
+  <>check
+    ["x == 1"] -> ../on
+    [else] -> what
+  what
+    #exit
+      "x = 0"
+    @CHECK -> check
+on
+  @TIMEOUT
+    ["x == 1"] -> off
+    [else] --
+      "x = 0"
+'''
+    sc = parse(input)
+    tables = StateChartTables(sc)
+    off, on = sc.states
+    check, what = off.states
+    assert [row.state for row in tables.states] == list(sc.all_states)
+    assert [row.parent for row in tables.states] == [None, 0, 1, 1, 0]
+    assert [row.composite for row in tables.states] == [0, 1, None, None, None]
+    assert [row.initial for row in tables.composites] == [off.id, check.id]
+    # transient states have no enum value
+    assert tables.substates == [off.id, on.id, what.id]
+    assert [row.substates for row in tables.composites] == [0, 2]
+    assert [row.value for row in tables.states] == [0, 0, 0, 0, 1]
+    assert [row.transient for row in tables.states] == [
+        False, False, True, False, False
+    ]
+    assert [row.exits for row in tables.states] == [
+        True, True, False, True, False
+    ]
+    # identical guards and actions share their index
+    assert tables.guards == ['x == 1']
+    assert tables.actions == [['x = 0']]
+    assert tables.states[0].init == tables.states[3].exit == 1
+
+    rows = tables.transitions[tables.states[4].transitions:]
+    assert [(row.guard, row.action) for row in rows] == [(1, 0), (0, 1)]
+    assert rows[1].target is None
+    assert rows[1].exit_count == rows[1].entry_count == 0
+    row = tables.transitions[tables.states[2].transitions]
+    assert (row.target, row.exit_count, row.entry_count) == (on.id, 2, 1)
+    assert tables.state_type == 'uint8_t'
+    assert tables.packed_counts
+    assert tables.max_entry_count == 1
+
+
+def test_index_type():
+    assert index_type(255) == 'uint8_t'
+    assert index_type(256) == 'uint16_t'
+    assert index_type(2**16) == 'uint32_t'
+
+
+def test_table_dispatch_header(tmp_path):
+    with open(os.path.join(current_dir, 'code', 'composite.sc')) as input_:
+        sc = parse(input_.read())
+    switch_dir = tmp_path / 'switch'
+    table_dir = tmp_path / 'table'
+    switch_dir.mkdir()
+    table_dir.mkdir()
+    switch_header, _ = code(sc, str(switch_dir))
+    table_header, table_impl = code(sc, str(table_dir), dispatch='table')
+    with open(switch_header) as switch_file, open(table_header) as table_file:
+        assert switch_file.read() == table_file.read()
+    with open(table_impl) as table_file:
+        assert 'composite_states[]' in table_file.read()
+    with pytest.raises(Error):
+        code(sc, str(table_dir), backend='python', dispatch='table')
@@ -0,0 +1,113 @@
+import os
+import pytest
+from sclang.lib.parser import parse
+from sclang.lib.code import code, style
+from sclang.lib.timers import Timers
+
+current_dir = os.path.dirname(__file__)
+
+input = '''
+/some_name
+off
+  @after(100ms) -> on
+on
+  #exit
+    "bye()"
+  @after(2s) -> off
+  slow
+    @after(1s) -> fast
+  fast
+'''
+
+
+def read_timed_files(tmp_path, backend='jinja', **options):
+    with open(os.path.join(current_dir, 'code', 'timed.sc')) as input_:
+        sc = parse(input_.read())
+    files = code(sc, str(tmp_path), backend=backend, **options)
+    contents = []
+    for file_ in files:
+        with open(file_) as content:
+            contents.append(content.read())
+    return contents
+
+
+def test_timer_indices():
+    sc = parse(input)
+    off, on = sc.states
+    slow, fast = on.states
+    timers = Timers(sc, style)
+    # the exclusive states share their timers
+    assert timers.indices == {off: 0, on: 0, slow: 1}
+    assert timers.count == 2
+    assert Timers(parse(input.replace('@after(1s)', '@ONE')), style).count == 1
+
+
+def test_timer_actions():
+    sc = parse(input)
+    off, on = sc.states
+    slow, fast = on.states
+    timers = Timers(sc, style)
+    assert timers.init_actions(slow) == [
+        'some_name_timer_start(sc, 1, SOME_NAME_EVT_ON_SLOW_TIMEOUT, '
+        'SOME_NAME_TIMER_TICKS(1000))'
+    ]
+    assert timers.exit_actions(on) == [
+        'some_name_timer_cancel(sc, 0)', 'bye()'
+    ]
+    assert timers.init_actions(fast) == []
+
+
+@pytest.mark.parametrize('backend', ['jinja', 'python'])
+def test_timer_wheel(tmp_path, backend):
+    header, impl = read_timed_files(tmp_path, backend)
+    assert ('void timed_init(timed_sc_t* sc, '
+            'timed_timer_wheel_t* timer_wheel);\n') in header
+    assert '    timed_timer_t timers[TIMED_TIMER_COUNT];\n' in header
+    assert ('void timed_timer_wheel_tick('
+            'timed_timer_wheel_t* timer_wheel);\n') in header
+    assert '    timed_timer_cancel(sc, 0);\n' in impl
+
+
+@pytest.mark.parametrize('dispatch', ['table', 'flat'])
+def test_timer_dispatches(tmp_path, dispatch):
+    _, impl = read_timed_files(tmp_path, dispatch=dispatch)
+    assert ('timed_timer_start(sc, 1, TIMED_EVT_RUNNING_SLOW_TIMEOUT, '
+            'TIMED_TIMER_TICKS(2000))') in impl
+
+
+def test_region_timers():
+    sc = parse('''
+/some_name
+@after(1s) -> some_name
+|| left
+  @after(1s) -> left
+  a
+    @after(1s) -> b
+  b
+    @after(1s) -> a
+|| right
+  c
+    @after(1s) -> c
+''')
+    left, right = sc.states
+    a, b = left.states
+    c = right.states[0]
+    # the regions being active together, they don't share their timers
+    assert Timers(sc, style).indices == {sc: 0, left: 1, a: 2, b: 2, c: 3}
+
+
+@pytest.mark.parametrize('backend', ['jinja', 'python'])
+@pytest.mark.parametrize('count, type_', [(256, 'uint8_t'),
+                                          (300, 'uint16_t')])
+def test_timer_index_type(tmp_path, backend, count, type_):
+    # the timers of the regions all being active together
+    sc = parse('/many\n' + ''.join(
+        '|| region{}\n  idle\n    @after(1ms) -> idle\n'.format(
+            ''.join('abcdefghij'[int(digit)] for digit in str(i)))
+        for i in range(count)))
+    timers = Timers(sc, style)
+    assert timers.count == count
+    assert timers.index_type == type_
+    header = code(sc, str(tmp_path), backend=backend)[0]
+    with open(header) as header_:
+        assert '    {} index;\n'.format(type_) in header_.read()